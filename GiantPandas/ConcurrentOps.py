@@ -0,0 +1,30 @@
+import concurrent.futures
+from typing import Callable, Iterable, Iterator
+
+
+class ConcurrentOps(object):
+    def __init__(self):
+        pass
+
+    @classmethod
+    def iter_ordered_map(
+        cls, function: Callable, argument_iterable: Iterable, max_workers: int
+    ) -> Iterator:
+        """
+        Yield function(argument) for every argument in order, computed by max_workers
+        threads; at most 2 * max_workers results are computed ahead of the consumer,
+        and the ones not started yet are cancelled when the consumer stops.
+        """
+        max_workers = max(1, max_workers)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_list = []
+            try:
+                for argument in argument_iterable:
+                    future_list.append(executor.submit(function, argument))
+                    if len(future_list) >= 2 * max_workers:
+                        yield future_list.pop(0).result()
+                while len(future_list) > 0:
+                    yield future_list.pop(0).result()
+            finally:
+                for future in future_list:
+                    future.cancel()
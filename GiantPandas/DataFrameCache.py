@@ -0,0 +1,237 @@
+import os
+import json
+import time
+import uuid
+import hashlib
+import threading
+import contextlib
+import pandas as pd
+from typing import Dict, List, NoReturn
+
+
+class DataFrameCache(object):
+    """
+    Python module to cache dataframes as uncompressed feather files in a local
+    directory, read back through memory-mapping. Requires pyarrow.
+
+    Entries expire after their time-to-live, can be invalidated by tag, and the least
+    recently used entries are evicted when the total size exceeds max_size_bytes.
+
+    Instances sharing a directory, in the same or other processes, see each other's
+    entries: the index is re-read and saved under a file lock on every change. A hit
+    only touches the modification time of its file, which is read back as its last
+    access on eviction.
+    """
+
+    _index_file_name = "index.json"
+    _index_lock_file_name = "index.lock"
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_size_bytes: int = 1024 ** 3,
+        default_ttl: float = None,
+    ) -> NoReturn:
+        """
+        :param cache_dir: directory holding the cached files, created if missing
+        :param max_size_bytes: size budget of all cached files together
+        :param default_ttl: seconds an entry stays valid when set without a ttl; None
+            keeps entries until they are evicted or invalidated
+        """
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.default_ttl = default_ttl
+        self.__lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.__index = self.__load_index()
+
+    def get(self, key: str) -> pd.DataFrame:
+        """
+        :return: cached dataframe, or None if the key is missing or expired
+        """
+        import pyarrow.feather as feather
+
+        entry_id = self._get_entry_id(key)
+        file_path = self.__get_file_path(entry_id)
+        with self.__lock:
+            entry = self.__index.get(entry_id)
+            if entry is None and os.path.exists(file_path):
+                # an entry of another instance
+                entry = self.__read_index().get(entry_id)
+                if entry is not None:
+                    self.__index[entry_id] = entry
+        if entry is None:
+            return None
+        if self.__is_expired(entry):
+            # the index is reloaded, as another instance may have set the key again
+            with self.__lock_index():
+                entry = self.__index.get(entry_id)
+                if entry is None or self.__is_expired(entry):
+                    self.__remove_entry(entry_id)
+                    self.__save_index()
+                    return None
+
+        try:
+            os.utime(file_path)
+            table = feather.read_table(file_path, memory_map=True)
+        except (OSError, ValueError):
+            with self.__lock_index():
+                self.__remove_entry(entry_id)
+                self.__save_index()
+            return None
+        return table.to_pandas()
+
+    def set(
+        self, key: str, df: pd.DataFrame, ttl: float = None, tag_list: List[str] = None
+    ) -> bool:
+        """
+        :param ttl: seconds the entry stays valid; default_ttl if None
+        :param tag_list: tags by which the entry can be invalidated
+        :return: whether the dataframe could be cached within max_size_bytes
+        """
+        import pyarrow.feather as feather
+
+        # feather keeps neither duplicate nor non-string column names
+        if not df.columns.is_unique or not all(
+            isinstance(column_name, str) for column_name in df.columns
+        ):
+            return False
+
+        entry_id = self._get_entry_id(key)
+        file_path = self.__get_file_path(entry_id)
+        temp_file_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            feather.write_feather(df, temp_file_path, compression="uncompressed")
+        except (TypeError, ValueError, OSError):
+            # e.g. object columns holding values of mixed types
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+            return False
+
+        ttl = ttl if ttl is not None else self.default_ttl
+        with self.__lock_index():
+            os.replace(temp_file_path, file_path)
+            now = time.time()
+            self.__index[entry_id] = dict(
+                size=os.path.getsize(file_path),
+                created_at=now,
+                last_access=now,
+                expires_at=now + ttl if ttl is not None else None,
+                tag_list=list(tag_list or []),
+            )
+            self.__evict(keep_entry_id=entry_id)
+            self.__save_index()
+            return entry_id in self.__index
+
+    def invalidate(self, key: str) -> NoReturn:
+        with self.__lock_index():
+            self.__remove_entry(self._get_entry_id(key))
+            self.__save_index()
+
+    def invalidate_tag(self, tag: str, except_tag: str = None) -> int:
+        """
+        :param except_tag: entries also tagged with except_tag are kept, e.g. the
+            entries of the current version of a source
+        :return: number of invalidated entries
+        """
+        with self.__lock_index():
+            entry_id_list = [
+                entry_id
+                for entry_id, entry in self.__index.items()
+                if tag in entry["tag_list"] and except_tag not in entry["tag_list"]
+            ]
+            for entry_id in entry_id_list:
+                self.__remove_entry(entry_id)
+            self.__save_index()
+        return len(entry_id_list)
+
+    def clear(self) -> NoReturn:
+        with self.__lock_index():
+            for entry_id in list(self.__index.keys()):
+                self.__remove_entry(entry_id)
+            self.__save_index()
+
+    def get_size(self) -> int:
+        with self.__lock:
+            self.__index = self.__load_index()
+            return sum(entry["size"] for entry in self.__index.values())
+
+    @classmethod
+    def _get_entry_id(cls, key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def __get_file_path(self, entry_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{entry_id}.feather")
+
+    def __remove_entry(self, entry_id: str) -> NoReturn:
+        self.__index.pop(entry_id, None)
+        file_path = self.__get_file_path(entry_id)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    def __evict(self, keep_entry_id: str = None) -> NoReturn:
+        for entry_id, entry in list(self.__index.items()):
+            if self.__is_expired(entry):
+                self.__remove_entry(entry_id)
+
+        total_size = sum(entry["size"] for entry in self.__index.values())
+        for entry_id in sorted(self.__index.keys(), key=self.__get_last_access):
+            if total_size <= self.max_size_bytes:
+                break
+            if entry_id == keep_entry_id:
+                continue
+            total_size -= self.__index[entry_id]["size"]
+            self.__remove_entry(entry_id)
+
+        if total_size > self.max_size_bytes and keep_entry_id is not None:
+            self.__remove_entry(keep_entry_id)
+
+    @contextlib.contextmanager
+    def __lock_index(self):
+        """
+        Hold the index exclusively, across threads and processes, and reload it so
+        that changes of other instances are merged instead of overwritten.
+        """
+        import fcntl
+
+        lock_file_path = os.path.join(self.cache_dir, self._index_lock_file_name)
+        with self.__lock, open(lock_file_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self.__index = self.__load_index()
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @classmethod
+    def __is_expired(cls, entry: dict) -> bool:
+        return entry["expires_at"] is not None and entry["expires_at"] < time.time()
+
+    def __get_last_access(self, entry_id: str) -> float:
+        try:
+            return os.path.getmtime(self.__get_file_path(entry_id))
+        except OSError:
+            return self.__index[entry_id]["last_access"]
+
+    def __read_index(self) -> Dict[str, dict]:
+        index_file_path = os.path.join(self.cache_dir, self._index_file_name)
+        try:
+            with open(index_file_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return dict()
+
+    def __load_index(self) -> Dict[str, dict]:
+        return {
+            entry_id: entry
+            for entry_id, entry in self.__read_index().items()
+            if os.path.exists(self.__get_file_path(entry_id))
+        }
+
+    def __save_index(self) -> NoReturn:
+        index_file_path = os.path.join(self.cache_dir, self._index_file_name)
+        temp_index_file_path = f"{index_file_path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_index_file_path, "w", encoding="utf-8") as f:
+            json.dump(self.__index, f)
+        os.replace(temp_index_file_path, index_file_path)
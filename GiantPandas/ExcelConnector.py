@@ -1,10 +1,16 @@
 import os
 import sys
 import xlrd
+import hashlib
+import zipfile
+import concurrent.futures
 import pandas as pd
 from FreqObjectOps import DirOps
 from GiantPandas import PandasOps
-from typing import List, Tuple, NoReturn, Union
+from GiantPandas.DataFrameCache import DataFrameCache
+from GiantPandas.XlsxReader import XlsxReader
+from GiantPandas.XlsxStreamWriter import XlsxStreamWriter
+from typing import Dict, Iterable, Iterator, List, Tuple, NoReturn, Union
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
@@ -19,31 +25,193 @@ class ExcelConnector(object):
 
     @classmethod
     def get_sheet_names(cls, file_path: str) -> list:
+        if zipfile.is_zipfile(file_path):
+            return XlsxReader(file_path).get_sheet_names()
         excel_file = xlrd.open_workbook(file_path, on_demand=True)
         return excel_file.sheet_names()
 
+    @classmethod
+    def get_sheet_dimensions(cls, file_path: str) -> Dict[str, Tuple[int, int]]:
+        """
+        Get the number of rows and columns of each sheet of an xlsx file from the
+        dimension recorded in the sheet, without reading any cells.
+        """
+        return XlsxReader(file_path).get_sheet_dimensions()
+
     @classmethod
     def get_dataframe_from_excel(
         cls,
         file_path: str,
         sheet_name: Union[int, str] = None,
         skip_rows_list: list = None,
+        cache: DataFrameCache = None,
     ) -> pd.DataFrame:
+        """
+        :param cache: local cache of parsed sheets, keyed on the path, size,
+            modification time and contents of the file; entries of previous versions
+            of the file are dropped when it changes
+        """
         if sheet_name is None:
             sheet_name = 0
 
-        df = pd.read_excel(
-            file_path, sheet_name=sheet_name, encoding="utf-8", skiprows=skip_rows_list
-        )
+        if cache is not None:
+            file_tag, file_version_tag = cls._get_excel_cache_tags(file_path)
+            cache_key = "|".join(
+                [file_version_tag, repr(sheet_name), repr(skip_rows_list)]
+            )
+            df = cache.get(cache_key)
+            if df is not None:
+                return df
+
+        df = pd.read_excel(file_path, sheet_name=sheet_name, skiprows=skip_rows_list)
+
+        if cache is not None:
+            cache.invalidate_tag(file_tag, except_tag=file_version_tag)
+            cache.set(cache_key, df, tag_list=[file_tag, file_version_tag])
         return df
 
+    @classmethod
+    def invalidate_excel_cache(cls, cache: DataFrameCache, file_path: str) -> int:
+        """
+        Drop cached sheets of the file.
+
+        :return: number of invalidated entries
+        """
+        return cache.invalidate_tag(cls._get_excel_cache_tags(file_path)[0])
+
+    @classmethod
+    def _get_excel_cache_tags(cls, file_path: str) -> Tuple[str, str]:
+        """
+        :return: tag of the file, and tag of its current version
+        """
+        file_path = os.path.abspath(file_path)
+        file_stat = os.stat(file_path)
+        file_tag = f"excel|{file_path}"
+        file_version_tag = "|".join(
+            [
+                file_tag,
+                str(file_stat.st_size),
+                str(file_stat.st_mtime_ns),
+                cls._get_excel_file_hash(file_path),
+            ]
+        )
+        return file_tag, file_version_tag
+
+    @classmethod
+    def _get_excel_file_hash(cls, file_path: str) -> str:
+        """
+        Hash the contents of the file. The central directory of an xlsx file lists
+        the crc32 and size of every member, so only the directory is read.
+        """
+        file_hash = hashlib.sha256()
+        if zipfile.is_zipfile(file_path):
+            with zipfile.ZipFile(file_path) as zip_file:
+                for info in zip_file.infolist():
+                    file_hash.update(
+                        f"{info.filename}|{info.CRC}|{info.file_size}\n".encode("utf-8")
+                    )
+        else:
+            with open(file_path, "rb") as f:
+                for block in iter(lambda: f.read(1024 ** 2), b""):
+                    file_hash.update(block)
+        return file_hash.hexdigest()
+
+    @classmethod
+    def get_dataframes_from_excel(
+        cls,
+        file_path: str,
+        sheet_names: List[Union[int, str]] = None,
+        max_workers: int = None,
+    ) -> Dict[Union[int, str], pd.DataFrame]:
+        """
+        Read several sheets, all of them if sheet_names is None. For xlsx files the
+        shared strings are read once and the sheets are decoded concurrently by
+        max_workers processes.
+
+        :return: dict of sheet name to dataframe, in the order of sheet_names
+        """
+        if not zipfile.is_zipfile(file_path):
+            return pd.read_excel(file_path, sheet_name=sheet_names)
+
+        reader = XlsxReader(file_path)
+        if sheet_names is None:
+            sheet_names = reader.get_sheet_names()
+        reader.load_cell_contents()
+
+        if max_workers is None:
+            max_workers = min(len(sheet_names), os.cpu_count() or 1)
+        if max_workers <= 1 or len(sheet_names) <= 1:
+            return {
+                sheet_name: _get_dataframe_from_xlsx_reader(reader, sheet_name)
+                for sheet_name in sheet_names
+            }
+
+        # the loaded reader is sent to every worker once, instead of with each sheet
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_set_worker_xlsx_reader,
+            initargs=(reader,),
+        ) as executor:
+            return dict(
+                zip(
+                    sheet_names,
+                    executor.map(_get_dataframe_from_worker_xlsx_reader, sheet_names),
+                )
+            )
+
+    @classmethod
+    def iter_dataframe_from_excel(
+        cls,
+        file_path: str,
+        sheet_name: Union[int, str] = None,
+        chunksize: int = 100000,
+        usecols: List[Union[int, str]] = None,
+        dtype: Union[str, Dict[str, str]] = None,
+        skip_rows_list: list = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Iterate over a sheet in dataframes of at most chunksize rows. Rows of xlsx
+        files are streamed from the sheet xml, so memory use does not grow with the
+        sheet; other files are read whole.
+
+        :param usecols: names or 0-based positions of the columns to read
+        :param dtype: dtype, or dict of column name to dtype, of the columns
+        """
+        if not zipfile.is_zipfile(file_path):
+            df = cls.get_dataframe_from_excel(
+                file_path, sheet_name=sheet_name, skip_rows_list=skip_rows_list
+            )
+            if usecols is not None:
+                df = df[[df.columns[c] if isinstance(c, int) else c for c in usecols]]
+            if dtype is not None:
+                df = df.astype(dtype)
+            yield from PandasOps.iter_row_chunks(df, chunk_size=chunksize)
+            return None
+
+        yield from XlsxReader(file_path).iter_dataframe(
+            sheet_name=sheet_name,
+            chunk_size=chunksize,
+            usecols=usecols,
+            dtype=dtype,
+            skip_rows_list=skip_rows_list,
+        )
+
     @classmethod
     def send_dataframe_to_excel(
         cls,
         file_path: str,
-        df_to_sheet_name_tuple_list: List[Tuple[pd.DataFrame, str]],
+        df_to_sheet_name_tuple_list: List[
+            Tuple[Union[pd.DataFrame, Iterable[pd.DataFrame]], str]
+        ],
         write_index: bool = False,
+        streaming: bool = False,
     ) -> NoReturn:
+        """
+        :param df_to_sheet_name_tuple_list: with streaming, each dataframe can also be
+            an iterable of dataframe chunks
+        :param streaming: write rows one at a time with constant memory, continuing
+            sheets beyond the row limit on sheets named sheet_2, sheet_3, ...
+        """
         folder = DirOps.get_directory_from_file_path(file_path=file_path)
         if folder in [None, ""]:
             folder = os.getcwd()
@@ -52,6 +220,14 @@ class ExcelConnector(object):
         if not DirOps.exists_folder(folder):
             os.makedirs(folder)
 
+        if streaming:
+            with XlsxStreamWriter(file_path) as writer:
+                for df_iterable, sheet in df_to_sheet_name_tuple_list:
+                    writer.write_dataframes(
+                        df_iterable, sheet_name=sheet, write_index=write_index
+                    )
+            return
+
         writer = pd.ExcelWriter(
             file_path, engine="xlsxwriter", options={"strings_to_urls": False}
         )
@@ -61,3 +237,24 @@ class ExcelConnector(object):
             df.to_excel(writer, sheet_name=sheet, index=write_index)
         writer.save()
         return
+
+
+_worker_xlsx_reader = None
+
+
+def _set_worker_xlsx_reader(reader: XlsxReader) -> NoReturn:
+    global _worker_xlsx_reader
+    _worker_xlsx_reader = reader
+
+
+def _get_dataframe_from_worker_xlsx_reader(sheet_name: Union[int, str]) -> pd.DataFrame:
+    return _get_dataframe_from_xlsx_reader(_worker_xlsx_reader, sheet_name)
+
+
+def _get_dataframe_from_xlsx_reader(
+    reader: XlsxReader, sheet_name: Union[int, str]
+) -> pd.DataFrame:
+    df = reader.get_dataframe(sheet_name=sheet_name)
+    if df is None:
+        return pd.DataFrame()
+    return df
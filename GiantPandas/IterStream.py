@@ -0,0 +1,86 @@
+import io
+import queue
+import threading
+from typing import Iterable, NoReturn
+
+
+class IterStream(io.RawIOBase):
+    """
+    Read-only file-like object over an iterable of byte chunks.
+
+    With prefetch > 0 the chunks are produced in a background thread into a bounded
+    queue, so producing the next chunk overlaps with consuming the current one while
+    at most prefetch + 1 chunks are held in memory.
+    """
+
+    _end_of_stream = object()
+
+    def __init__(self, chunk_iterable: Iterable[bytes], prefetch: int = 0) -> NoReturn:
+        super().__init__()
+        self.__buffer = b""
+        self.__position = 0
+        self.__queue = None
+        self.__stop_event = threading.Event()
+
+        if prefetch > 0:
+            self.__queue = queue.Queue(maxsize=prefetch)
+            self.__chunk_iterator = None
+            self.__producer = threading.Thread(
+                target=self.__produce, args=(chunk_iterable,), daemon=True
+            )
+            self.__producer.start()
+        else:
+            self.__chunk_iterator = iter(chunk_iterable)
+            self.__producer = None
+
+    def __produce(self, chunk_iterable: Iterable[bytes]) -> NoReturn:
+        try:
+            for chunk in chunk_iterable:
+                if not self.__put(chunk):
+                    return None
+            self.__put(self._end_of_stream)
+        except BaseException as e:
+            self.__put(e)
+
+    def __put(self, item) -> bool:
+        while not self.__stop_event.is_set():
+            try:
+                self.__queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def __next_chunk(self) -> bytes:
+        if self.__queue is None:
+            return next(self.__chunk_iterator, None)
+
+        item = self.__queue.get()
+        if item is self._end_of_stream:
+            self.__queue.put(item)
+            return None
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while self.__position >= len(self.__buffer):
+            chunk = self.__next_chunk()
+            if chunk is None:
+                return 0
+            self.__buffer = chunk
+            self.__position = 0
+
+        size = min(len(b), len(self.__buffer) - self.__position)
+        b[:size] = self.__buffer[self.__position : self.__position + size]
+        self.__position += size
+        return size
+
+    def close(self) -> NoReturn:
+        self.__stop_event.set()
+        if self.__producer is not None:
+            self.__producer.join()
+        super().close()
@@ -2,7 +2,7 @@ import numpy as np
 import pandas as pd
 import itertools
 from FreqObjectOps import StrOps
-from typing import List, Dict, NoReturn, Union
+from typing import List, Dict, Iterator, NoReturn, Tuple, Union
 
 
 class PandasOps(object):
@@ -13,6 +13,13 @@ class PandasOps(object):
     def get_row_count(cls, df: pd.DataFrame) -> int:
         return len(df.index)
 
+    @classmethod
+    def iter_row_chunks(
+        cls, df: pd.DataFrame, chunk_size: int
+    ) -> Iterator[pd.DataFrame]:
+        for start in range(0, cls.get_row_count(df), chunk_size):
+            yield df.iloc[start : start + chunk_size]
+
     @classmethod
     def get_dict_from_two_columns(
         cls,
@@ -36,12 +43,63 @@ class PandasOps(object):
     @classmethod
     def get_dataframe_with_all_permutations_from_dict(
         cls, dict_with_list_values: Dict[str, list]
-    ):
-        df = pd.DataFrame(
-            list(itertools.product(*dict_with_list_values.values())),
-            columns=dict_with_list_values.keys(),
+    ) -> pd.DataFrame:
+        """
+        Get the cartesian product of the lists, in the order of itertools.product,
+        built column-wise so that no tuple is created per row.
+        """
+        value_array_list = cls._get_permutation_value_arrays(dict_with_list_values)
+        row_count = int(np.prod([len(values) for values in value_array_list]))
+        return cls._get_permutations_dataframe(
+            dict_with_list_values.keys(), value_array_list, 0, row_count
+        )
+
+    @classmethod
+    def iter_dataframe_with_all_permutations_from_dict(
+        cls, dict_with_list_values: Dict[str, list], chunk_size: int
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Iterate over the rows of get_dataframe_with_all_permutations_from_dict in
+        dataframes of at most chunk_size rows, without building the whole product.
+        """
+        value_array_list = cls._get_permutation_value_arrays(dict_with_list_values)
+        row_count = int(np.prod([len(values) for values in value_array_list]))
+        for start in range(0, row_count, chunk_size):
+            yield cls._get_permutations_dataframe(
+                dict_with_list_values.keys(),
+                value_array_list,
+                start,
+                min(start + chunk_size, row_count),
+            )
+
+    @classmethod
+    def _get_permutation_value_arrays(
+        cls, dict_with_list_values: Dict[str, list]
+    ) -> list:
+        # values are converted once, with the dtype pandas infers for the column
+        value_list_list = [list(values) for values in dict_with_list_values.values()]
+        return [
+            pd.Series(value_list, dtype=None if len(value_list) > 0 else object).array
+            for value_list in value_list_list
+        ]
+
+    @classmethod
+    def _get_permutations_dataframe(
+        cls, column_names, value_array_list: list, start: int, stop: int
+    ) -> pd.DataFrame:
+        row_number_array = np.arange(start, stop, dtype=np.int64)
+        column_array_list = []
+        repeat_count = 1
+        # the last column changes fastest, as in itertools.product
+        for values in reversed(value_array_list):
+            value_count = len(values)
+            value_index_array = (row_number_array // repeat_count) % max(value_count, 1)
+            column_array_list.append(values.take(value_index_array))
+            repeat_count *= value_count
+        return pd.DataFrame(
+            dict(zip(column_names, reversed(column_array_list))),
+            index=pd.RangeIndex(start, stop),
         )
-        return df
 
     @classmethod
     def set_column_as_index(
@@ -110,3 +168,175 @@ class PandasOps(object):
                 return 1
 
         return df[column_name].map(__get_length_of_dtype_object).max()
+
+    @classmethod
+    def profile_columns(
+        cls,
+        df: pd.DataFrame,
+        column_name_list: List[str] = None,
+        sample_size: int = None,
+        random_state: int = None,
+    ) -> pd.DataFrame:
+        """
+        Get dtype, null count, integrality, minimum, maximum and maximum utf-8 byte
+        length of every column, computed column-wise over the whole frame at once.
+
+        :param column_name_list: columns to profile; all columns if None
+        :param sample_size: profile a random sample of this many rows instead of all
+            rows, in which case counts, extremes and lengths are estimates
+        :return: dataframe indexed by column name
+        """
+        if column_name_list is not None:
+            df = df[column_name_list]
+        if sample_size is not None and sample_size < cls.get_row_count(df):
+            df = df.sample(n=sample_size, random_state=random_state)
+
+        profile_df = pd.DataFrame(index=df.columns)
+        profile_df["dtype"] = [dtype.name for dtype in df.dtypes]
+        is_null_df = df.isna()
+        profile_df["null_count"] = is_null_df.sum().to_numpy(dtype=np.int64)
+
+        # whole numbers within int64 range; nan, inf and values out of range are not
+        profile_df["is_integer"] = [
+            pd.api.types.is_integer_dtype(dtype) for dtype in df.dtypes
+        ]
+        float_df = df.select_dtypes(include="floating")
+        if len(float_df.columns) > 0:
+            # missing values of nullable floats are NaN here
+            float_values = float_df.to_numpy(dtype=np.float64, na_value=np.nan)
+            is_null = np.isnan(float_values)
+            with np.errstate(invalid="ignore"):
+                is_whole = is_null | (np.mod(float_values, 1) == 0)
+            is_in_range = is_null | (
+                (float_values >= -(2 ** 63)) & (float_values < 2 ** 63)
+            )
+            profile_df.loc[float_df.columns, "is_integer"] = (
+                is_whole & is_in_range
+            ).all(axis=0)
+
+        profile_df["min"] = np.nan
+        profile_df["max"] = np.nan
+        comparable_df = df.select_dtypes(include=["number", "datetime"])
+        if len(comparable_df.columns) > 0:
+            profile_df["min"] = comparable_df.min().astype(object)
+            profile_df["max"] = comparable_df.max().astype(object)
+
+        profile_df["max_byte_length"] = np.nan
+        for column_name in df.select_dtypes(include="object").columns:
+            column = df[column_name][~is_null_df[column_name]]
+            profile_df.at[column_name, "max_byte_length"] = cls._get_maximum_byte_length(
+                column
+            )
+
+        return profile_df
+
+    @classmethod
+    def optimize_memory(
+        cls,
+        df: pd.DataFrame,
+        category_max_unique_ratio: float = 0.5,
+        use_arrow_strings: bool = False,
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Convert columns to dtypes using less memory without changing any value:
+        integers to the smallest integer dtype holding their range, floats to float32
+        if every value is exactly representable, and string columns to category if
+        they have few distinct values.
+
+        :param category_max_unique_ratio: highest ratio of distinct to non-null values
+            of string columns converted to category
+        :param use_arrow_strings: convert other string columns to pyarrow-backed
+            strings (requires pyarrow)
+        :return: optimized dataframe, and dataframe indexed by column name with the
+            dtype and memory usage in bytes of every column before and after
+        """
+        optimized_df = df.copy()
+        if len(df.columns) > 0:
+            optimized_df = pd.concat(
+                [
+                    cls._get_memory_optimized_column(
+                        df.iloc[:, column_index],
+                        category_max_unique_ratio=category_max_unique_ratio,
+                        use_arrow_strings=use_arrow_strings,
+                    )
+                    for column_index in range(len(df.columns))
+                ],
+                axis=1,
+            )
+            optimized_df.columns = df.columns
+
+        report_df = pd.DataFrame(index=df.columns)
+        report_df["dtype_before"] = [dtype.name for dtype in df.dtypes]
+        report_df["dtype_after"] = [dtype.name for dtype in optimized_df.dtypes]
+        report_df["bytes_before"] = df.memory_usage(index=False, deep=True).to_numpy()
+        report_df["bytes_after"] = optimized_df.memory_usage(
+            index=False, deep=True
+        ).to_numpy()
+        return optimized_df, report_df
+
+    @classmethod
+    def _get_memory_optimized_column(
+        cls,
+        column: pd.Series,
+        category_max_unique_ratio: float,
+        use_arrow_strings: bool,
+    ) -> pd.Series:
+        if pd.api.types.is_bool_dtype(column.dtype):
+            return column
+
+        if pd.api.types.is_unsigned_integer_dtype(column.dtype):
+            return pd.to_numeric(column, downcast="unsigned")
+
+        if pd.api.types.is_integer_dtype(column.dtype):
+            return pd.to_numeric(column, downcast="integer")
+
+        if column.dtype == "float64":
+            values = column.to_numpy()
+            with np.errstate(over="ignore"):
+                float32_values = values.astype(np.float32)
+            if np.array_equal(
+                float32_values.astype(np.float64), values, equal_nan=True
+            ):
+                return column.astype(np.float32)
+            return column
+
+        if column.dtype != "object":
+            return column
+
+        non_null_column = column.dropna()
+        if len(non_null_column) == 0 or (
+            pd.api.types.infer_dtype(non_null_column, skipna=False) != "string"
+        ):
+            return column
+        if non_null_column.nunique() <= category_max_unique_ratio * len(
+            non_null_column
+        ):
+            return column.astype("category")
+        if use_arrow_strings:
+            return column.astype("string[pyarrow]")
+        return column
+
+    @classmethod
+    def _get_maximum_byte_length(cls, column: pd.Series) -> int:
+        if pd.api.types.infer_dtype(column, skipna=False) != "string":
+            column = column.astype(str)
+        values = column.to_numpy()
+        if len(values) == 0:
+            return 0
+
+        # a character takes 1 to 4 bytes in utf-8, so only values with at least a
+        # quarter of the longest character length can be the longest in bytes
+        character_length_array = np.fromiter(
+            map(len, values), dtype=np.int64, count=len(values)
+        )
+        max_character_length = character_length_array.max()
+        return max(
+            max_character_length,
+            max(
+                (
+                    len(value.encode("utf-8"))
+                    for value in values[4 * character_length_array > max_character_length]
+                ),
+                default=0,
+            ),
+        )
@@ -0,0 +1,179 @@
+import struct
+import numpy as np
+import pandas as pd
+from typing import Dict, List, NoReturn, Tuple
+from GiantPandas.exceptions import InvalidValue
+
+
+class PgCopyOps(object):
+    """
+    Python module to encode dataframe into PSQL binary COPY format.
+    """
+
+    _binary_signature = b"PGCOPY\n\xff\r\n\x00"
+    _binary_header = _binary_signature + struct.pack(">ii", 0, 0)
+    _binary_trailer = struct.pack(">h", -1)
+
+    _psql_epoch = np.datetime64("2000-01-01T00:00:00", "ns")
+
+    # psql column type to the numpy big-endian dtype of its binary representation
+    _psql_column_type_to_binary_dtype_dict = {
+        "bigint": ">i8",
+        "double precision": ">f8",
+        "timestamp": ">i8",
+        "boolean": "u1",
+    }
+    _psql_variable_length_column_type_list = ["character varying", "text"]
+
+    # column types as named in information_schema.columns, where they differ
+    _psql_column_type_to_data_type_dict = {"timestamp": "timestamp without time zone"}
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def get_binary_header(cls) -> bytes:
+        return cls._binary_header
+
+    @classmethod
+    def get_binary_trailer(cls) -> bytes:
+        return cls._binary_trailer
+
+    @classmethod
+    def get_binary_compatible_data_types(cls, column_type: str) -> List[str]:
+        """
+        Get the data types, as named in information_schema.columns, of the columns
+        reading the binary representation of column_type as the same values.
+        """
+        column_type = column_type.split("(")[0]
+        if column_type in cls._psql_variable_length_column_type_list:
+            return cls._psql_variable_length_column_type_list
+        return [cls._psql_column_type_to_data_type_dict.get(column_type, column_type)]
+
+    @classmethod
+    def encode_dataframe_to_binary(
+        cls, df: pd.DataFrame, column_name_type_dict: Dict[str, str]
+    ) -> bytes:
+        """
+        Encode the rows of a dataframe as binary COPY tuples, without header and
+        trailer. Each column is packed with one vectorized pass and the fields are
+        scattered into a single buffer at their row-major offsets.
+        """
+        row_count = len(df.index)
+        if row_count == 0:
+            return b""
+
+        field_list = [
+            cls._get_binary_field(df[column_name], column_type)
+            for column_name, column_type in column_name_type_dict.items()
+        ]
+
+        # every field is a 4 byte length followed by the value, and nulls have no value
+        field_size_array = np.column_stack(
+            [4 + value_length_array for _, value_length_array, _ in field_list]
+        )
+        row_size_array = 2 + field_size_array.sum(axis=1)
+        row_offset_array = np.cumsum(row_size_array) - row_size_array
+        field_offset_array = (
+            row_offset_array[:, None]
+            + 2
+            + np.cumsum(field_size_array, axis=1)
+            - field_size_array
+        )
+
+        buffer = np.empty(int(row_size_array.sum()), dtype=np.uint8)
+        cls._scatter_fixed_width(
+            buffer,
+            row_offset_array,
+            np.full(row_count, len(field_list), dtype=">i2"),
+        )
+
+        for column_index, (is_null, value_length_array, value_array) in enumerate(
+            field_list
+        ):
+            field_offset = field_offset_array[:, column_index]
+            cls._scatter_fixed_width(
+                buffer,
+                field_offset,
+                np.where(is_null, -1, value_length_array).astype(">i4"),
+            )
+            if isinstance(value_array, np.ndarray):
+                cls._scatter_fixed_width(
+                    buffer, field_offset[~is_null] + 4, value_array[~is_null]
+                )
+            else:
+                cls._scatter_variable_width(
+                    buffer,
+                    field_offset[~is_null] + 4,
+                    value_length_array[~is_null],
+                    value_array,
+                )
+
+        return buffer.tobytes()
+
+    @classmethod
+    def _get_binary_field(
+        cls, column: pd.Series, column_type: str
+    ) -> Tuple[np.ndarray, np.ndarray, object]:
+        """
+        Return the null mask, the byte length of each value (0 for nulls) and either
+        an array of fixed width values or the concatenated bytes of variable length
+        values.
+        """
+        is_null = column.isna().to_numpy()
+
+        if column_type.startswith(tuple(cls._psql_variable_length_column_type_list)):
+            encoded_value_list = [
+                (value if isinstance(value, str) else str(value)).encode("utf-8")
+                for value in column.to_numpy()[~is_null]
+            ]
+            value_length_array = np.zeros(len(is_null), dtype=np.int64)
+            value_length_array[~is_null] = [len(v) for v in encoded_value_list]
+            return is_null, value_length_array, b"".join(encoded_value_list)
+
+        if column_type not in cls._psql_column_type_to_binary_dtype_dict:
+            raise InvalidValue(
+                column_type,
+                list(cls._psql_column_type_to_binary_dtype_dict.keys())
+                + cls._psql_variable_length_column_type_list,
+            )
+        binary_dtype = np.dtype(cls._psql_column_type_to_binary_dtype_dict[column_type])
+
+        if column_type == "timestamp":
+            values = pd.to_datetime(column).to_numpy(dtype="datetime64[ns]")
+            values = (values - cls._psql_epoch).astype(np.int64) // 1000
+        elif column_type == "bigint":
+            values = column.fillna(0).to_numpy(dtype=np.int64)
+        elif column_type == "boolean":
+            values = column.fillna(False).to_numpy(dtype=bool)
+        else:
+            values = column.to_numpy(dtype=np.float64)
+
+        value_length_array = np.where(is_null, 0, binary_dtype.itemsize)
+        return is_null, value_length_array, values.astype(binary_dtype)
+
+    @classmethod
+    def _scatter_fixed_width(
+        cls, buffer: np.ndarray, offset_array: np.ndarray, value_array: np.ndarray
+    ) -> NoReturn:
+        # the width is explicit, as a chunk can hold no value of a column
+        value_bytes = value_array.view(np.uint8).reshape(
+            len(value_array), value_array.dtype.itemsize
+        )
+        buffer[offset_array[:, None] + np.arange(value_bytes.shape[1])] = value_bytes
+
+    @classmethod
+    def _scatter_variable_width(
+        cls,
+        buffer: np.ndarray,
+        offset_array: np.ndarray,
+        value_length_array: np.ndarray,
+        value_bytes: bytes,
+    ) -> NoReturn:
+        if len(value_bytes) == 0:
+            return None
+        value_start_array = np.cumsum(value_length_array) - value_length_array
+        buffer[
+            np.repeat(offset_array - value_start_array, value_length_array)
+            + np.arange(len(value_bytes))
+        ] = np.frombuffer(value_bytes, dtype=np.uint8)
@@ -1,13 +1,25 @@
+import io
 import os
 import sys
 import re
-import io
 import math
+import functools
+import itertools
+import uuid
+import asyncio
+import threading
+import contextlib
+import concurrent.futures
 import psycopg2
+import psycopg2.pool
 import numpy as np
 import pandas as pd
-from typing import NoReturn, Dict, Tuple, Union
+from typing import NoReturn, Dict, Iterator, List, Tuple, Union
 from GiantPandas import PandasOps
+from GiantPandas.IterStream import IterStream
+from GiantPandas.DataFrameCache import DataFrameCache
+from GiantPandas.S3Connector import S3Connector
+from GiantPandas.PgCopyOps import PgCopyOps
 from GiantPandas.exceptions import InvalidValue
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
@@ -21,41 +33,525 @@ class PsqlConnector(object):
     # general csv features
     _csv_sep = ","
     _csv_null_identifier = {
-        "int32": -9223372036854775808,
-        "int64": -9223372036854775808,
         "general": "#N/A",
     }
 
+    # rows serialized per chunk while streaming a dataframe into COPY, and number of
+    # serialized chunks buffered ahead of the connection
+    _copy_chunk_size = 100000
+    _copy_prefetch_chunks = 2
+    _copy_format_allowed_value_list = ["text", "csv", "binary"]
+
+    # characters rewritten in object columns so that they fit the delimited text format
+    _text_format_translation_table = str.maketrans(
+        {"\t": " ", "\r": None, "\n": None, '"': "'", ",": "|"}
+    )
+
+    # psql type oid to pandas dtype of query results; other types are kept as objects
+    _psql_type_oid_to_pandas_dtype_dict = {
+        16: "boolean",
+        20: "Int64",
+        21: "Int64",
+        23: "Int64",
+        700: "float64",
+        701: "float64",
+        1082: "datetime64[ns]",
+        1114: "datetime64[ns]",
+        1184: "datetime64[ns, UTC]",
+    }
+    _query_chunk_size = 100000
+
+    # schema of the temporary tables of the current session
+    _temporary_schema_name = "pg_temp"
+    _max_identifier_length = 63
+
+    # column types whose values INSERT ... SELECT rounds into integer columns
+    _fractional_column_type_list = ["double precision", "real", "numeric"]
+
+    # column holding the hash of the uploaded values of each row in delta uploads
+    _row_hash_column_name = "gp_row_hash"
+
+    # tables read by a query, tagged on its cached results
+    _query_table_name_pattern = re.compile(
+        r"""\b(?:FROM|JOIN)\s+((?:"[^"]+"|[\w$]+)(?:\s*\.\s*(?:"[^"]+"|[\w$]+))?)""",
+        flags=re.IGNORECASE,
+    )
+
     def __init__(
-        self, host: str, dbname: str, username: str, password: str, port: str = "5432"
+        self,
+        host: str,
+        dbname: str,
+        username: str,
+        password: str,
+        port: str = "5432",
+        use_pool: bool = False,
+        pool_min_size: int = 1,
+        pool_max_size: int = 5,
+        pool_pre_ping: bool = True,
+        query_cache: DataFrameCache = None,
     ) -> NoReturn:
+        """
+        :param use_pool: keep connections open in a thread-safe pool and reuse them
+            across calls instead of connecting once per call
+        :param pool_min_size: number of connections opened when the pool is created
+        :param pool_max_size: maximum number of connections open at the same time,
+            pooled or not; callers block until a connection is released when all of
+            them are in use
+        :param pool_pre_ping: check that a pooled connection is still alive before
+            handing it out, replacing it if it is not
+        :param query_cache: local cache of query results; results of tables written
+            through upload_dataframe are invalidated, other writes are not tracked
+        """
         self.__host = host
         self.__dbname = dbname
         self.__user = username
         self.__password = password
         self.__port = port
 
-    def _get_database_connectors(self) -> Tuple:
-        conn = psycopg2.connect(
+        self.use_pool = use_pool
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = max(pool_min_size, pool_max_size)
+        self.pool_pre_ping = pool_pre_ping
+        self.__pool = None
+        self.__pool_lock = threading.Lock()
+        self.__pool_semaphore = threading.BoundedSemaphore(self.pool_max_size)
+        self.query_cache = query_cache
+
+    def __enter__(self) -> "PsqlConnector":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> NoReturn:
+        self.close()
+
+    def close(self) -> NoReturn:
+        """
+        Close all pooled connections. The pool is re-created on the next call.
+        """
+        with self.__pool_lock:
+            if self.__pool is not None:
+                self.__pool.closeall()
+                self.__pool = None
+
+    def _get_connector_kwargs(self) -> Dict[str, str]:
+        return dict(
+            host=self.__host,
+            dbname=self.__dbname,
+            username=self.__user,
+            password=self.__password,
+            port=self.__port,
+        )
+
+    def _get_connection_kwargs(self) -> Dict[str, str]:
+        return dict(
             host=self.__host,
             user=self.__user,
             password=self.__password,
             dbname=self.__dbname,
             port=self.__port,
         )
+
+    def _get_pool(self) -> psycopg2.pool.ThreadedConnectionPool:
+        with self.__pool_lock:
+            if self.__pool is None:
+                self.__pool = psycopg2.pool.ThreadedConnectionPool(
+                    self.pool_min_size,
+                    self.pool_max_size,
+                    **self._get_connection_kwargs(),
+                )
+            return self.__pool
+
+    def _is_connection_alive(self, conn) -> bool:
+        if conn.closed:
+            return False
+        if not self.pool_pre_ping:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            conn.rollback()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            return False
+        return True
+
+    def _get_connection(self):
+        self.__pool_semaphore.acquire()
+        try:
+            if not self.use_pool:
+                return psycopg2.connect(**self._get_connection_kwargs())
+
+            pool = self._get_pool()
+            conn = pool.getconn()
+            while not self._is_connection_alive(conn):
+                pool.putconn(conn, close=True)
+                conn = pool.getconn()
+        except Exception:
+            self.__pool_semaphore.release()
+            raise
+        return conn
+
+    def _release_connection(self, conn) -> NoReturn:
+        try:
+            if not self.use_pool:
+                conn.close()
+                return None
+
+            with self.__pool_lock:
+                pool = self.__pool
+            if pool is not None and not pool.closed:
+                pool.putconn(conn, close=bool(conn.closed))
+            else:
+                conn.close()
+        finally:
+            self.__pool_semaphore.release()
+
+    def _get_database_connectors(self) -> Tuple:
+        conn = self._get_connection()
         cur = conn.cursor()
         return conn, cur
 
-    def _close_database_connectors(self, conn, cur) -> NoReturn:
-        conn.commit()
-        cur.close()
-        conn.close()
+    def _close_database_connectors(self, conn, cur, commit: bool = True) -> NoReturn:
+        try:
+            if commit:
+                conn.commit()
+            elif not conn.closed:
+                try:
+                    conn.rollback()
+                except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                    pass
+            cur.close()
+        finally:
+            self._release_connection(conn)
         return None
 
-    def get_query_results(self, query: str) -> pd.DataFrame:
+    @contextlib.contextmanager
+    def _open_database_connectors(self) -> Iterator[Tuple]:
+        """
+        Yield a connection and a cursor; commit and release them on success, roll back
+        and release them on failure.
+        """
         conn, cur = self._get_database_connectors()
-        df = pd.read_sql_query(query, con=conn)
+        try:
+            yield conn, cur
+        except BaseException:
+            self._close_database_connectors(conn, cur, commit=False)
+            raise
         self._close_database_connectors(conn, cur)
+
+    def get_query_results(
+        self,
+        query: str,
+        use_copy: bool = False,
+        use_cache: bool = True,
+        cache_ttl: float = None,
+    ) -> pd.DataFrame:
+        """
+        :param use_copy: export the results through COPY TO STDOUT and parse them as
+            csv with dtypes derived from the psql column types, instead of building a
+            python object per value; values of other types are returned as strings
+        :param use_cache: read and store the results in query_cache, if one is set
+        :param cache_ttl: seconds the cached results stay valid; the default_ttl of
+            query_cache if None
+        """
+        use_cache = use_cache and self.query_cache is not None
+        if use_cache:
+            cache_key = self._get_query_cache_key(query=query, use_copy=use_copy)
+            df = self.query_cache.get(cache_key)
+            if df is not None:
+                return df
+
+        with self._open_database_connectors() as (conn, cur):
+            if use_copy:
+                df = self._get_query_results_with_copy(query=query, cur=cur)
+            else:
+                df = pd.read_sql_query(query, con=conn)
+
+        if use_cache:
+            self.query_cache.set(
+                cache_key,
+                df,
+                ttl=cache_ttl,
+                tag_list=self._get_query_cache_tags(query=query),
+            )
+        return df
+
+    def invalidate_query_cache(self, schema_name: str, table_name: str) -> int:
+        """
+        Drop cached results of queries reading the table.
+
+        :return: number of invalidated results
+        """
+        if self.query_cache is None:
+            return 0
+        return self.query_cache.invalidate_tag(
+            self._get_query_cache_tag(f"{schema_name}.{table_name}")
+        )
+
+    def _get_query_cache_key(self, query: str, use_copy: bool) -> str:
+        normalized_query = " ".join(query.strip().rstrip(";").split())
+        return "|".join(
+            [
+                f"{self.__user}@{self.__host}:{self.__port}/{self.__dbname}",
+                "copy" if use_copy else "sql",
+                normalized_query,
+            ]
+        )
+
+    def _get_query_cache_tag(self, table_name: str) -> str:
+        table_name = ".".join(
+            name.strip().strip('"').lower() for name in table_name.split(".")
+        )
+        if "." not in table_name:
+            table_name = f"public.{table_name}"
+        return f"{self.__host}:{self.__port}/{self.__dbname}|{table_name}"
+
+    def _get_query_cache_tags(self, query: str) -> List[str]:
+        return sorted(
+            set(
+                self._get_query_cache_tag(table_name)
+                for table_name in self._query_table_name_pattern.findall(query)
+            )
+        )
+
+    def get_many_query_results(
+        self, query_list: List[str], max_workers: int = None, use_copy: bool = False
+    ) -> List[Union[pd.DataFrame, Exception]]:
+        """
+        Run queries concurrently, each on its own connection.
+
+        :param max_workers: maximum number of queries running at the same time;
+            pool_max_size if None, which also bounds the number of open connections
+        :return: results in the order of query_list; a query that failed has the
+            raised exception in place of its dataframe
+        """
+        result_list = [None] * len(query_list)
+        for query_index, result in self.iter_many_query_results(
+            query_list, max_workers=max_workers, use_copy=use_copy
+        ):
+            result_list[query_index] = result
+        return result_list
+
+    def iter_many_query_results(
+        self, query_list: List[str], max_workers: int = None, use_copy: bool = False
+    ) -> Iterator[Tuple[int, Union[pd.DataFrame, Exception]]]:
+        """
+        Run queries concurrently and yield (index in query_list, dataframe or raised
+        exception) as the queries complete.
+        """
+        if len(query_list) == 0:
+            return None
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._get_query_worker_count(query_list, max_workers)
+        ) as executor:
+            future_to_query_index_dict = {
+                executor.submit(self.get_query_results, query, use_copy): query_index
+                for query_index, query in enumerate(query_list)
+            }
+            for future in concurrent.futures.as_completed(future_to_query_index_dict):
+                query_index = future_to_query_index_dict[future]
+                try:
+                    yield query_index, future.result()
+                except Exception as e:
+                    yield query_index, e
+
+    async def get_query_results_async(
+        self, query: str, use_copy: bool = False
+    ) -> pd.DataFrame:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.get_query_results, query, use_copy
+        )
+
+    async def get_many_query_results_async(
+        self, query_list: List[str], max_workers: int = None, use_copy: bool = False
+    ) -> List[Union[pd.DataFrame, Exception]]:
+        """
+        Awaitable counterpart of get_many_query_results.
+        """
+        if len(query_list) == 0:
+            return []
+
+        loop = asyncio.get_running_loop()
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._get_query_worker_count(query_list, max_workers)
+        )
+        # the event loop is not blocked until running queries finish, e.g. when the
+        # awaiting task is cancelled; queries that have not started are dropped
+        try:
+            return await asyncio.gather(
+                *[
+                    loop.run_in_executor(
+                        executor, self.get_query_results, query, use_copy
+                    )
+                    for query in query_list
+                ],
+                return_exceptions=True,
+            )
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_query_worker_count(self, query_list: List[str], max_workers: int) -> int:
+        if max_workers is None:
+            max_workers = self.pool_max_size
+        return max(1, min(max_workers, len(query_list)))
+
+    def _get_query_results_with_copy(self, query: str, cur) -> pd.DataFrame:
+        query = query.strip().rstrip(";")
+        # the query is closed on a new line, as it can end in a -- comment
+        cur.execute(f"SELECT * FROM ({query}\n) AS giant_pandas_query LIMIT 0;")
+        description = cur.description
+
+        # columns are renamed by position, and datetimes are exported as microseconds
+        # since epoch so that they are parsed as integers
+        column_alias_list = [f"c{i}" for i in range(len(description))]
+        select_expression_list = [
+            f"(EXTRACT(EPOCH FROM {column_alias}) * 1000000)::bigint"
+            if self._is_datetime_type_oid(column.type_code)
+            else column_alias
+            for column_alias, column in zip(column_alias_list, description)
+        ]
+        copy_command = f"""
+            COPY (
+                SELECT {", ".join(select_expression_list)}
+                FROM ({query}
+                ) AS giant_pandas_query ({", ".join(column_alias_list)})
+            )
+            TO STDOUT
+            WITH (FORMAT csv, NULL '{self._csv_null_identifier["general"]}');"""
+
+        # the export is written into a pipe by a separate thread and parsed while it
+        # is being received
+        read_fd, write_fd = os.pipe()
+        copy_error_list = []
+
+        def __copy_to_pipe():
+            try:
+                with os.fdopen(write_fd, "wb") as write_file:
+                    cur.copy_expert(copy_command, write_file)
+            except BaseException as e:
+                copy_error_list.append(e)
+
+        copy_thread = threading.Thread(target=__copy_to_pipe, daemon=True)
+        copy_thread.start()
+        try:
+            with os.fdopen(read_fd, "rb") as read_file:
+                df = self._read_csv_query_results(read_file, description=description)
+        finally:
+            copy_thread.join()
+
+        if len(copy_error_list) > 0:
+            raise copy_error_list[0]
+        return df
+
+    def _read_csv_query_results(self, csv_file, description) -> pd.DataFrame:
+        null_identifier = self._csv_null_identifier["general"]
+        dtype_dict = dict()
+        na_values_dict = dict()
+        for column_index, column in enumerate(description):
+            dtype = self._psql_type_oid_to_pandas_dtype_dict.get(column.type_code)
+            if dtype == "Int64" or self._is_datetime_type_oid(column.type_code):
+                # parsed as int64, or as strings when nulls are present, so that
+                # bigint values never pass through float64
+                na_values_dict[column_index] = []
+            elif dtype == "float64":
+                dtype_dict[column_index] = dtype
+                na_values_dict[column_index] = [null_identifier, "NaN"]
+            else:
+                dtype_dict[column_index] = "object"
+                na_values_dict[column_index] = [null_identifier]
+
+        try:
+            df = pd.read_csv(
+                csv_file,
+                header=None,
+                names=list(range(len(description))),
+                dtype=dtype_dict,
+                na_values=na_values_dict,
+                keep_default_na=False,
+                encoding="utf-8",
+            )
+        except pd.errors.EmptyDataError:
+            return self._get_dataframe_from_records([], description=description)
+
+        for column_index, column in enumerate(description):
+            dtype = self._psql_type_oid_to_pandas_dtype_dict.get(column.type_code)
+            if dtype == "Int64":
+                df[column_index] = self._get_integer_array_from_csv_column(
+                    df[column_index]
+                )
+            elif dtype == "boolean":
+                df[column_index] = (
+                    df[column_index].map({"t": True, "f": False}).astype(dtype)
+                )
+            elif self._is_datetime_type_oid(column.type_code):
+                df[column_index] = self._get_datetime_from_csv_column(
+                    df[column_index], dtype=dtype
+                )
+        df.columns = [column.name for column in description]
+        return df
+
+    def _is_datetime_type_oid(self, type_oid: int) -> bool:
+        dtype = self._psql_type_oid_to_pandas_dtype_dict.get(type_oid)
+        return dtype is not None and dtype.startswith("datetime64")
+
+    def _get_datetime_from_csv_column(self, column: pd.Series, dtype: str) -> pd.Series:
+        microseconds = self._get_integer_array_from_csv_column(column)
+        values = microseconds.to_numpy(dtype=np.int64, na_value=np.iinfo(np.int64).min)
+        values = values.astype("datetime64[us]").astype("datetime64[ns]")
+        datetime_column = pd.Series(values, index=column.index)
+        if dtype.endswith("UTC]"):
+            datetime_column = datetime_column.dt.tz_localize("UTC")
+        return datetime_column
+
+    def _get_integer_array_from_csv_column(self, column: pd.Series) -> pd.Series:
+        if column.dtype != "object":
+            return column.astype("Int64")
+
+        is_null = (column == self._csv_null_identifier["general"]).to_numpy()
+        values = np.zeros(len(column), dtype=np.int64)
+        values[~is_null] = column[~is_null].astype(np.int64).to_numpy()
+        return pd.Series(
+            pd.arrays.IntegerArray(values, is_null), index=column.index
+        )
+
+    def iter_query_results(
+        self, query: str, chunk_size: int = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Yield results of a psql query as dataframes of at most chunk_size rows, read
+        through a server-side cursor. Column dtypes are derived from the psql column
+        types, so they are the same in every chunk.
+        """
+        if chunk_size is None:
+            chunk_size = self._query_chunk_size
+
+        with self._open_database_connectors() as (conn, cur):
+            with conn.cursor(name=f"giant_pandas_{uuid.uuid4().hex}") as server_cur:
+                server_cur.itersize = chunk_size
+                server_cur.execute(query)
+                while True:
+                    row_list = server_cur.fetchmany(chunk_size)
+                    if len(row_list) == 0:
+                        break
+                    yield self._get_dataframe_from_records(
+                        row_list, description=server_cur.description
+                    )
+
+    def _get_dataframe_from_records(self, row_list: list, description) -> pd.DataFrame:
+        df = pd.DataFrame.from_records(
+            row_list, columns=list(range(len(description)))
+        )
+        for column_index, column in enumerate(description):
+            dtype = self._psql_type_oid_to_pandas_dtype_dict.get(column.type_code)
+            if dtype is None:
+                continue
+            if dtype.startswith("datetime64"):
+                df[column_index] = pd.to_datetime(
+                    df[column_index], utc=dtype.endswith("UTC]")
+                )
+            else:
+                df[column_index] = df[column_index].astype(dtype)
+        df.columns = [column.name for column in description]
         return df
 
     def upload_dataframe(
@@ -64,86 +560,619 @@ class PsqlConnector(object):
         schema_name: str,
         table_name: str,
         if_exists: str = "replace",
+        chunk_size: int = None,
+        format: str = "text",
+        parallel: int = 1,
+        key_column_list: List[str] = None,
     ) -> NoReturn:
+        """
+        :param if_exists: "replace" reloads the table, "append" adds the rows, "upsert"
+            inserts new rows and updates existing rows matched on key_column_list,
+            "delta" compares row hashes with the table and only sends new and changed
+            rows, and deletes rows whose keys are no longer in the dataframe
+        :param format: COPY format; "text" sends delimited text with delimiters removed
+            from object columns, "csv" sends quoted csv without changing any value,
+            "binary" sends numbers and timestamps in their binary representation
+            without changing any value
+        :param parallel: number of worker processes that serialize and COPY row
+            partitions concurrently, each over its own connection
+        :param key_column_list: columns identifying a row, required for "upsert" and
+            "delta"
+        """
         if_exists = str(if_exists).lower()
-        if_exists_allowed_value_list = ["replace", "append"]
+        if_exists_allowed_value_list = ["replace", "append", "upsert", "delta"]
 
         if if_exists not in if_exists_allowed_value_list:
             raise InvalidValue(if_exists, if_exists_allowed_value_list)
 
+        format = str(format).lower()
+        if format not in self._copy_format_allowed_value_list:
+            raise InvalidValue(format, self._copy_format_allowed_value_list)
+
         df_for_upload = df.copy()
 
+        self._correct_memory_optimized_columns(df_for_upload)
         self._correct_float_columns(df_for_upload)
         PandasOps.set_column_names_to_alpha_numeric(df_for_upload)
         PandasOps.set_column_names_to_snake_case(df_for_upload, "lower")
-        self._clean_delimiter_in_object_columns_from_dataframe(df_for_upload)
+        if format == "text":
+            self._clean_delimiter_in_object_columns_from_dataframe(df_for_upload)
 
-        if if_exists == "replace":
-            self._drop_table(schema_name=schema_name, table_name=table_name)
+        if if_exists in ["upsert", "delta"]:
+            key_column_list = self._get_normalized_column_names(key_column_list or [])
+            if len(key_column_list) == 0 or not PandasOps.exists_column(
+                df_for_upload, key_column_list
+            ):
+                raise InvalidValue(key_column_list, df_for_upload.columns.tolist())
+            df_for_upload.drop_duplicates(
+                subset=key_column_list, keep="last", inplace=True
+            )
 
-        self._create_table(
+        df_deleted_key = None
+        if if_exists == "delta":
+            df_for_upload[self._row_hash_column_name] = (
+                pd.util.hash_pandas_object(df_for_upload, index=False)
+                .to_numpy()
+                .view(np.int64)
+            )
+            df_for_upload, df_deleted_key = self._get_delta_of_dataframe(
+                df=df_for_upload,
+                schema_name=schema_name,
+                table_name=table_name,
+                key_column_list=key_column_list,
+            )
+            if PandasOps.get_row_count(df_for_upload) == 0 and (
+                PandasOps.get_row_count(df_deleted_key) == 0
+            ):
+                return None
+
+        column_name_type_dict = self._get_dict_of_column_name_to_type_from_dataframe_for_psql(
+            df_for_upload
+        )
+
+        # a replacing staging table becomes the target table, so it is a regular
+        # table; rows that are moved out of a staging table go through a temporary
+        # table, or an unlogged one when parallel connections have to see it
+        load_schema_name = schema_name
+        if if_exists in ["replace", "upsert", "delta"] or parallel > 1:
+            load_table_name = self._get_staging_table_name(table_name)
+            if if_exists != "replace" and parallel <= 1:
+                load_schema_name = self._temporary_schema_name
+        else:
+            load_table_name = table_name
+
+        # parallel workers cannot share a transaction, so they copy into a committed
+        # staging table which is moved into the target table in the final transaction
+        if parallel > 1:
+            self._insert_df_to_psql_in_parallel(
+                df=df_for_upload,
+                schema_name=schema_name,
+                table_name=load_table_name,
+                unlogged=if_exists != "replace",
+                parallel=parallel,
+                chunk_size=chunk_size,
+                format=format,
+                column_name_type_dict=column_name_type_dict,
+            )
+
+        # every remaining step runs in one transaction; on replace the data is loaded
+        # into a staging table that takes the place of the target table before commit
+        try:
+            with self._open_database_connectors() as (conn, cur):
+                if parallel <= 1:
+                    # rows appended without a staging table go into the target table,
+                    # which must be kept
+                    self._create_table(
+                        schema_name=load_schema_name,
+                        table_name=load_table_name,
+                        column_name_type_dict=column_name_type_dict,
+                        cur=cur,
+                    )
+                    if load_table_name == table_name:
+                        self._widen_character_varying_columns(
+                            schema_name=schema_name,
+                            table_name=table_name,
+                            column_name_type_dict=column_name_type_dict,
+                            cur=cur,
+                        )
+                        if format == "binary":
+                            self._check_binary_column_types(
+                                schema_name=schema_name,
+                                table_name=table_name,
+                                column_name_type_dict=column_name_type_dict,
+                                cur=cur,
+                            )
+                    self._insert_df_to_psql(
+                        df=df_for_upload,
+                        schema_name=load_schema_name,
+                        table_name=load_table_name,
+                        cur=cur,
+                        chunk_size=chunk_size,
+                        format=format,
+                        column_name_type_dict=column_name_type_dict,
+                    )
+
+                if if_exists == "replace":
+                    self._replace_table(
+                        schema_name=schema_name,
+                        table_name=table_name,
+                        new_table_name=load_table_name,
+                        cur=cur,
+                    )
+                elif load_table_name != table_name:
+                    self._create_table(
+                        schema_name=schema_name,
+                        table_name=table_name,
+                        column_name_type_dict=column_name_type_dict,
+                        cur=cur,
+                    )
+                    self._widen_character_varying_columns(
+                        schema_name=schema_name,
+                        table_name=table_name,
+                        column_name_type_dict=column_name_type_dict,
+                        cur=cur,
+                    )
+                    self._check_integer_columns(
+                        schema_name=schema_name,
+                        table_name=table_name,
+                        column_name_type_dict=column_name_type_dict,
+                        cur=cur,
+                    )
+                    if if_exists == "delta":
+                        self._add_column(
+                            schema_name=schema_name,
+                            table_name=table_name,
+                            column_name=self._row_hash_column_name,
+                            column_type="bigint",
+                            cur=cur,
+                        )
+                    if if_exists in ["upsert", "delta"]:
+                        self._create_unique_index(
+                            schema_name=schema_name,
+                            table_name=table_name,
+                            column_name_list=key_column_list,
+                            cur=cur,
+                        )
+                    self._move_rows_to_table(
+                        schema_name=schema_name,
+                        table_name=table_name,
+                        source_schema_name=load_schema_name,
+                        source_table_name=load_table_name,
+                        column_name_list=list(column_name_type_dict.keys()),
+                        key_column_list=key_column_list
+                        if if_exists in ["upsert", "delta"]
+                        else None,
+                        cur=cur,
+                    )
+                    if df_deleted_key is not None:
+                        self._delete_rows_by_key(
+                            schema_name=schema_name,
+                            table_name=table_name,
+                            df_key=df_deleted_key,
+                            cur=cur,
+                        )
+        except BaseException:
+            if parallel > 1:
+                self._drop_table(schema_name=schema_name, table_name=load_table_name)
+            raise
+
+        self.invalidate_query_cache(schema_name=schema_name, table_name=table_name)
+
+    def upload_csv_from_s3(
+        self,
+        s3_connector: S3Connector,
+        bucket: str,
+        object_key: str,
+        schema_name: str,
+        table_name: str,
+        if_exists: str = "replace",
+        compression: str = None,
+        csv_sep: str = None,
+        csv_null_identifier: str = None,
+        sample_size: int = 10000,
+        part_size: int = None,
+        max_workers: int = None,
+    ) -> int:
+        """
+        Stream a csv object with a header line from S3 into COPY, without parsing it
+        into a dataframe. The column types are inferred from the first sample_size
+        rows with the type mapping of upload_dataframe, except that string columns and
+        columns without values in the sample become text. Rows are loaded into a
+        staging table in a single transaction, as in upload_dataframe.
+
+        :param if_exists: "replace" or "append"
+        :param compression: "gzip" or "zstd"; inferred from the object if None
+        :return: number of loaded rows
+        """
+        if_exists = str(if_exists).lower()
+        if_exists_allowed_value_list = ["replace", "append"]
+        if if_exists not in if_exists_allowed_value_list:
+            raise InvalidValue(if_exists, if_exists_allowed_value_list)
+
+        csv_sep = csv_sep if csv_sep is not None else s3_connector.default_csv_sep
+        csv_null_identifier = (
+            csv_null_identifier
+            if csv_null_identifier is not None
+            else s3_connector.default_csv_null_identifier
+        )
+        load_schema_name = (
+            schema_name if if_exists == "replace" else self._temporary_schema_name
+        )
+        load_table_name = self._get_staging_table_name(table_name)
+
+        with s3_connector.open_object_stream(
+            bucket=bucket,
+            object_key=object_key,
+            compression=compression,
+            part_size=part_size,
+            max_workers=max_workers,
+        ) as object_stream:
+            line_stream = io.BufferedReader(object_stream, buffer_size=1024 ** 2)
+            head_contents = self._read_csv_records(line_stream, sample_size + 1)
+            column_name_type_dict = self._get_dict_of_column_name_to_type_from_csv_sample(
+                csv_contents=head_contents,
+                csv_sep=csv_sep,
+                csv_null_identifier=csv_null_identifier,
+            )
+
+            # the sampled head is sent first, followed by the rest of the object,
+            # which is read ahead in a background thread
+            chunk_iterator = itertools.chain(
+                [head_contents],
+                iter(functools.partial(line_stream.read, 1024 ** 2), b""),
+            )
+            columns = ", ".join(column_name_type_dict.keys())
+            copy_command = f"""
+                COPY {load_schema_name}."{load_table_name}" ({columns})
+                FROM STDIN
+                WITH (
+                    FORMAT csv,
+                    HEADER true,
+                    DELIMITER '{csv_sep}',
+                    NULL '{csv_null_identifier}',
+                    ENCODING 'UTF8'
+                );"""
+
+            with self._open_database_connectors() as (conn, cur):
+                self._create_table(
+                    schema_name=load_schema_name,
+                    table_name=load_table_name,
+                    column_name_type_dict=column_name_type_dict,
+                    cur=cur,
+                )
+                copy_stream = IterStream(
+                    chunk_iterator, prefetch=self._copy_prefetch_chunks
+                )
+                try:
+                    cur.copy_expert(copy_command, copy_stream)
+                finally:
+                    copy_stream.close()
+                row_count = cur.rowcount
+
+                if if_exists == "replace":
+                    self._replace_table(
+                        schema_name=schema_name,
+                        table_name=table_name,
+                        new_table_name=load_table_name,
+                        cur=cur,
+                    )
+                else:
+                    self._create_table(
+                        schema_name=schema_name,
+                        table_name=table_name,
+                        column_name_type_dict=column_name_type_dict,
+                        cur=cur,
+                    )
+                    self._check_integer_columns(
+                        schema_name=schema_name,
+                        table_name=table_name,
+                        column_name_type_dict=column_name_type_dict,
+                        cur=cur,
+                    )
+                    self._move_rows_to_table(
+                        schema_name=schema_name,
+                        table_name=table_name,
+                        source_schema_name=load_schema_name,
+                        source_table_name=load_table_name,
+                        column_name_list=list(column_name_type_dict.keys()),
+                        cur=cur,
+                    )
+
+        self.invalidate_query_cache(schema_name=schema_name, table_name=table_name)
+        return row_count
+
+    @classmethod
+    def _read_csv_records(
+        cls, line_stream: io.BufferedReader, record_count: int
+    ) -> bytes:
+        """
+        Read whole csv records from the stream: a record holding an odd number of
+        quotes so far goes on over the next line, as a quoted field holds a line break.
+        """
+        line_list = []
+        quote_count = 0
+        for line in line_stream:
+            line_list.append(line)
+            quote_count += line.count(b'"')
+            if quote_count % 2 == 0:
+                record_count -= 1
+                if record_count <= 0:
+                    break
+        return b"".join(line_list)
+
+    def _get_dict_of_column_name_to_type_from_csv_sample(
+        self, csv_contents: bytes, csv_sep: str, csv_null_identifier: str
+    ) -> Dict[str, str]:
+        df_sample = pd.read_csv(
+            io.BytesIO(csv_contents),
+            sep=csv_sep,
+            na_values=[csv_null_identifier],
+            keep_default_na=False,
+            encoding="utf-8-sig",
+        )
+        PandasOps.set_column_names_to_alpha_numeric(df_sample)
+        PandasOps.set_column_names_to_snake_case(df_sample, "lower")
+
+        # later rows may hold longer strings, or values in columns that are empty in
+        # the sample
+        column_name_type_dict = self._get_dict_of_column_name_to_type_from_dataframe_for_psql(
+            df_sample
+        )
+        for column_name, column_type in column_name_type_dict.items():
+            if (
+                column_type.startswith("character varying")
+                or df_sample[column_name].isna().all()
+            ):
+                column_name_type_dict[column_name] = "text"
+        return column_name_type_dict
+
+    def _get_delta_of_dataframe(
+        self,
+        df: pd.DataFrame,
+        schema_name: str,
+        table_name: str,
+        key_column_list: List[str],
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Compare the row hashes of the dataframe with the ones stored in the table.
+
+        :return: rows that are new or changed, and keys of table rows that are no
+            longer in the dataframe
+        """
+        if not self._exists_table(schema_name=schema_name, table_name=table_name):
+            return df, df.loc[[], key_column_list]
+
+        keys = ", ".join(key_column_list)
+        if self._exists_column(
             schema_name=schema_name,
             table_name=table_name,
-            column_name_type_dict=self._get_dict_of_column_name_to_type_from_dataframe_for_psql(
-                df_for_upload
-            ),
+            column_name=self._row_hash_column_name,
+        ):
+            row_hash = self._row_hash_column_name
+        else:
+            row_hash = f"NULL::bigint AS {self._row_hash_column_name}"
+        df_existing = self.get_query_results(
+            query=f"""SELECT {keys}, {row_hash} FROM {schema_name}."{table_name}";""",
+            use_copy=True,
+            use_cache=False,
         )
 
-        self._insert_df_to_psql(
-            df=df_for_upload, schema_name=schema_name, table_name=table_name
+        return self._get_delta_from_existing_row_hashes(
+            df=df, df_existing=df_existing, key_column_list=key_column_list
+        )
+
+    def _get_delta_from_existing_row_hashes(
+        self,
+        df: pd.DataFrame,
+        df_existing: pd.DataFrame,
+        key_column_list: List[str],
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        :param df_existing: keys and row hashes of the rows in the table
+        """
+        # hashes are compared as nullable integers, as floats would keep only 53 of
+        # their 64 bits
+        df_hash = df[key_column_list + [self._row_hash_column_name]].astype(
+            {self._row_hash_column_name: "Int64"}
         )
+        df_existing = df_existing.astype({self._row_hash_column_name: "Int64"})
+        df_merged = df_hash.merge(
+            df_existing,
+            on=key_column_list,
+            how="outer",
+            suffixes=("", "_existing"),
+            indicator=True,
+        )
+        is_changed = (df_merged["_merge"] == "left_only") | (
+            (df_merged["_merge"] == "both")
+            & (
+                df_merged[self._row_hash_column_name]
+                .ne(df_merged[f"{self._row_hash_column_name}_existing"])
+                .fillna(True)
+                .astype(bool)
+            )
+        )
+        df_changed_key = df_merged.loc[is_changed, key_column_list]
+        df_deleted_key = df_merged.loc[
+            df_merged["_merge"] == "right_only", key_column_list
+        ].reset_index(drop=True)
+
+        df_changed = df.merge(df_changed_key, on=key_column_list, how="inner")
+        return df_changed, df_deleted_key
 
-        for column_type in ["int64", "int32"]:
-            self._update_null_in_columns(
+    def _insert_df_to_psql_in_parallel(
+        self,
+        df: pd.DataFrame,
+        schema_name: str,
+        table_name: str,
+        parallel: int,
+        chunk_size: int,
+        format: str,
+        column_name_type_dict: Dict[str, str],
+        unlogged: bool = False,
+    ) -> NoReturn:
+        with self._open_database_connectors() as (conn, cur):
+            self._create_table(
                 schema_name=schema_name,
                 table_name=table_name,
-                df=df_for_upload,
-                column_dtype=column_type,
+                column_name_type_dict=column_name_type_dict,
+                cur=cur,
+                unlogged=unlogged,
             )
 
+        partition_size = max(1, math.ceil(PandasOps.get_row_count(df) / parallel))
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=parallel
+            ) as executor:
+                future_list = [
+                    executor.submit(
+                        _insert_df_partition_to_psql,
+                        self._get_connector_kwargs(),
+                        df_partition,
+                        schema_name,
+                        table_name,
+                        chunk_size,
+                        format,
+                        column_name_type_dict,
+                    )
+                    for df_partition in PandasOps.iter_row_chunks(
+                        df, chunk_size=partition_size
+                    )
+                ]
+                for future in future_list:
+                    future.result()
+        except BaseException:
+            self._drop_table(schema_name=schema_name, table_name=table_name)
+            raise
+
     def _insert_df_to_psql(
-        self, df: pd.DataFrame, schema_name: str, table_name: str,
+        self,
+        df: pd.DataFrame,
+        schema_name: str,
+        table_name: str,
+        cur=None,
+        chunk_size: int = None,
+        format: str = "text",
+        column_name_type_dict: Dict[str, str] = None,
     ) -> NoReturn:
-        conn, cur = self._get_database_connectors()
+        if cur is None:
+            with self._open_database_connectors() as (conn, cur):
+                return self._insert_df_to_psql(
+                    df=df,
+                    schema_name=schema_name,
+                    table_name=table_name,
+                    cur=cur,
+                    chunk_size=chunk_size,
+                    format=format,
+                    column_name_type_dict=column_name_type_dict,
+                )
 
-        # save dataframe as temp csv
-        csv_io = io.StringIO()
-        df.to_csv(
-            csv_io,
-            sep=self._csv_sep,
-            encoding="utf-8-sig",
-            header=False,
-            index=False,
-            na_rep=self._csv_null_identifier["general"],
-        )
-        csv_contents = csv_io.getvalue()
-        csv_contents = re.sub(
-            r"NaT", self._csv_null_identifier["general"], csv_contents
-        )
-        csv_io.seek(0)
-        csv_io.write(csv_contents)
-
-        # copy from temp csv to psql table
-        csv_io.seek(0)
-        cur.copy_from(
-            csv_io,
-            f"{schema_name}.{table_name}",
-            columns=df.columns.tolist(),
-            sep=self._csv_sep,
-            null=self._csv_null_identifier["general"],
-        )
-        csv_io.close()
+        if chunk_size is None:
+            chunk_size = self._copy_chunk_size
 
-        self._close_database_connectors(conn, cur)
+        if format == "binary":
+            if column_name_type_dict is None:
+                column_name_type_dict = self._get_dict_of_column_name_to_type_from_dataframe_for_psql(
+                    df
+                )
+            copy_options = "FORMAT binary"
+            chunk_iterator = self._iter_binary_chunks(
+                df=df,
+                chunk_size=chunk_size,
+                column_name_type_dict=column_name_type_dict,
+            )
+        elif format == "csv":
+            copy_options = f"""
+                FORMAT csv,
+                DELIMITER '{self._csv_sep}'
+            """
+            chunk_iterator = self._iter_quoted_csv_chunks(df=df, chunk_size=chunk_size)
+        else:
+            copy_options = f"""
+                FORMAT text,
+                DELIMITER '{self._csv_sep}',
+                NULL '{self._csv_null_identifier["general"]}'
+            """
+            chunk_iterator = self._iter_csv_chunks(df=df, chunk_size=chunk_size)
+
+        # stream dataframe to psql table, serializing the next chunks while the
+        # current one is sent
+        columns = ", ".join(df.columns.tolist())
+        copy_command = f"""
+            COPY {schema_name}."{table_name}" ({columns})
+            FROM STDIN
+            WITH ({copy_options});"""
+        copy_stream = IterStream(chunk_iterator, prefetch=self._copy_prefetch_chunks)
+        try:
+            cur.copy_expert(copy_command, copy_stream)
+        finally:
+            copy_stream.close()
+
+    def _iter_csv_chunks(self, df: pd.DataFrame, chunk_size: int) -> Iterator[bytes]:
+        for df_chunk in PandasOps.iter_row_chunks(df, chunk_size=chunk_size):
+            csv_contents = df_chunk.to_csv(
+                sep=self._csv_sep,
+                header=False,
+                index=False,
+                na_rep=self._csv_null_identifier["general"],
+            )
+            csv_contents = re.sub(
+                r"NaT", self._csv_null_identifier["general"], csv_contents
+            )
+            yield csv_contents.encode("utf-8")
+
+    def _iter_quoted_csv_chunks(
+        self, df: pd.DataFrame, chunk_size: int
+    ) -> Iterator[bytes]:
+        """
+        Yield csv chunks in which every non-null object value is quoted and nulls are
+        left empty, so that empty strings and nulls stay distinguishable.
+        """
+        for df_chunk in PandasOps.iter_row_chunks(df, chunk_size=chunk_size):
+            field_list = [
+                self._get_csv_fields_of_column(df_chunk.iloc[:, column_index])
+                for column_index in range(len(df_chunk.columns))
+            ]
+            row_list = field_list[0].str.cat(field_list[1:], sep=self._csv_sep)
+            yield ("\n".join(row_list.tolist()) + "\n").encode("utf-8")
+
+    def _get_csv_fields_of_column(self, column: pd.Series) -> pd.Series:
+        is_null = column.isna()
+        fields = pd.Series("", index=column.index, dtype="object")
+        if column.dtype == "object":
+            fields[~is_null] = (
+                '"'
+                + column[~is_null].astype(str).str.replace('"', '""', regex=False)
+                + '"'
+            )
+        else:
+            fields[~is_null] = column[~is_null].astype(str)
+        return fields
+
+    def _iter_binary_chunks(
+        self,
+        df: pd.DataFrame,
+        chunk_size: int,
+        column_name_type_dict: Dict[str, str],
+    ) -> Iterator[bytes]:
+        yield PgCopyOps.get_binary_header()
+        for df_chunk in PandasOps.iter_row_chunks(df, chunk_size=chunk_size):
+            yield PgCopyOps.encode_dataframe_to_binary(
+                df_chunk, column_name_type_dict=column_name_type_dict
+            )
+        yield PgCopyOps.get_binary_trailer()
 
     def _get_psql_array_format_of_python_list(self, python_list: list) -> str:
         psql_array = f"({str(python_list)[1:-1]})"
         return psql_array
 
-    def _execute_query(self, query: str) -> NoReturn:
-        conn, cur = self._get_database_connectors()
-        cur.execute(query)
-        self._close_database_connectors(conn, cur)
+    def _execute_query(self, query: str, cur=None) -> NoReturn:
+        if cur is None:
+            with self._open_database_connectors() as (conn, cur):
+                cur.execute(query)
+        else:
+            cur.execute(query)
 
     def _exists_table(self, schema_name: str, table_name: str) -> bool:
         check_command = f"""
@@ -153,12 +1182,260 @@ class PsqlConnector(object):
             WHERE  table_schema = '{schema_name}'
             AND    table_name = '{table_name}'
         );"""
-        check_df = self.get_query_results(query=check_command)
+        check_df = self.get_query_results(query=check_command, use_cache=False)
+        return check_df.at[0, "exists"]
+
+    def _exists_column(
+        self, schema_name: str, table_name: str, column_name: str
+    ) -> bool:
+        check_command = f"""
+        SELECT EXISTS (
+            SELECT 1
+            FROM   information_schema.columns
+            WHERE  table_schema = '{schema_name}'
+            AND    table_name = '{table_name}'
+            AND    column_name = '{column_name}'
+        );"""
+        check_df = self.get_query_results(query=check_command, use_cache=False)
         return check_df.at[0, "exists"]
 
-    def _drop_table(self, schema_name: str, table_name: str) -> NoReturn:
+    def _add_column(
+        self,
+        schema_name: str,
+        table_name: str,
+        column_name: str,
+        column_type: str,
+        cur=None,
+    ) -> NoReturn:
+        add_command = f"""ALTER TABLE {schema_name}."{table_name}" ADD COLUMN IF NOT EXISTS {column_name} {column_type};"""
+        self._execute_query(add_command, cur=cur)
+
+    def _widen_character_varying_columns(
+        self,
+        schema_name: str,
+        table_name: str,
+        column_name_type_dict: Dict[str, str],
+        cur,
+    ) -> NoReturn:
+        """
+        Widen character varying columns of the table that are shorter than the ones in
+        column_name_type_dict, which does not rewrite the table.
+        """
+        cur.execute(
+            f"""
+            SELECT column_name, character_maximum_length
+            FROM   information_schema.columns
+            WHERE  table_schema = '{schema_name}'
+            AND    table_name = '{table_name}'
+            AND    data_type = 'character varying'
+            AND    character_maximum_length IS NOT NULL;"""
+        )
+        alter_command = ""
+        for column_name, max_character_length in cur.fetchall():
+            column_type = column_name_type_dict.get(column_name)
+            if column_type is None:
+                continue
+            if column_type == "text" or (
+                column_type.startswith("character varying(")
+                and int(column_type[len("character varying(") : -1])
+                > max_character_length
+            ):
+                alter_command += f"""
+                    ALTER TABLE {schema_name}."{table_name}"
+                    ALTER COLUMN {column_name} TYPE {column_type};"""
+        if alter_command != "":
+            self._execute_query(alter_command, cur=cur)
+
+    def _check_integer_columns(
+        self,
+        schema_name: str,
+        table_name: str,
+        column_name_type_dict: Dict[str, str],
+        cur,
+    ) -> NoReturn:
+        """
+        Reject fractional columns of column_name_type_dict that are integer columns of
+        the table: moving rows with INSERT ... SELECT would round their values, where
+        COPY into the table fails on them.
+        """
+        cur.execute(
+            f"""
+            SELECT column_name, data_type
+            FROM   information_schema.columns
+            WHERE  table_schema = '{schema_name}'
+            AND    table_name = '{table_name}'
+            AND    data_type IN ('smallint', 'integer', 'bigint');"""
+        )
+        for column_name, data_type in cur.fetchall():
+            column_type = column_name_type_dict.get(column_name)
+            if column_type in self._fractional_column_type_list:
+                raise InvalidValue(
+                    f"{column_name} {column_type}", [f"{column_name} {data_type}"]
+                )
+
+    def _check_binary_column_types(
+        self,
+        schema_name: str,
+        table_name: str,
+        column_name_type_dict: Dict[str, str],
+        cur,
+    ) -> NoReturn:
+        """
+        Reject columns of column_name_type_dict of another type than the column of the
+        table: binary COPY does not convert values, so e.g. the bytes of a double
+        precision value would be read as a bigint.
+        """
+        cur.execute(
+            f"""
+            SELECT column_name, data_type
+            FROM   information_schema.columns
+            WHERE  table_schema = '{schema_name}'
+            AND    table_name = '{table_name}';"""
+        )
+        for column_name, data_type in cur.fetchall():
+            column_type = column_name_type_dict.get(column_name)
+            if column_type is None:
+                continue
+            if data_type not in PgCopyOps.get_binary_compatible_data_types(
+                column_type
+            ):
+                raise InvalidValue(
+                    f"{column_name} {column_type}", [f"{column_name} {data_type}"]
+                )
+
+    def _drop_table(self, schema_name: str, table_name: str, cur=None) -> NoReturn:
         del_command = f"""DROP TABLE IF EXISTS {schema_name}."{table_name}";"""
-        self._execute_query(del_command)
+        self._execute_query(del_command, cur=cur)
+
+    def _get_normalized_column_names(self, column_name_list: List[str]) -> List[str]:
+        df = pd.DataFrame(columns=column_name_list)
+        PandasOps.set_column_names_to_alpha_numeric(df)
+        PandasOps.set_column_names_to_snake_case(df, "lower")
+        return df.columns.tolist()
+
+    def _get_staging_table_name(self, table_name: str) -> str:
+        """
+        Get a table name unique to one upload, so that concurrent uploads into the
+        same table do not share a staging table.
+        """
+        suffix = f"__staging_{uuid.uuid4().hex[:12]}"
+        return f"{table_name[: self._max_identifier_length - len(suffix)]}{suffix}"
+
+    def _replace_table(
+        self, schema_name: str, table_name: str, new_table_name: str, cur=None
+    ) -> NoReturn:
+        replace_command = f"""
+            DROP TABLE IF EXISTS {schema_name}."{table_name}";
+            ALTER TABLE {schema_name}."{new_table_name}" RENAME TO "{table_name}";
+            """
+        self._execute_query(replace_command, cur=cur)
+
+    def _move_rows_to_table(
+        self,
+        schema_name: str,
+        table_name: str,
+        source_table_name: str,
+        column_name_list: list,
+        key_column_list: list = None,
+        cur=None,
+        source_schema_name: str = None,
+    ) -> NoReturn:
+        """
+        Insert all rows of the source table into the table and drop the source table.
+        With key_column_list, rows whose keys already exist are updated instead.
+
+        :param source_schema_name: schema of the source table; schema_name if None
+        """
+        if source_schema_name is None:
+            source_schema_name = schema_name
+        columns = ", ".join(column_name_list)
+        conflict_clause = ""
+        if key_column_list is not None:
+            update_column_list = [
+                col for col in column_name_list if col not in key_column_list
+            ]
+            if len(update_column_list) > 0:
+                conflict_action = "DO UPDATE SET " + ", ".join(
+                    [f"{col} = EXCLUDED.{col}" for col in update_column_list]
+                )
+            else:
+                conflict_action = "DO NOTHING"
+            conflict_clause = (
+                f"ON CONFLICT ({', '.join(key_column_list)}) {conflict_action}"
+            )
+
+        move_command = f"""
+            INSERT INTO {schema_name}."{table_name}" ({columns})
+            SELECT {columns} FROM {source_schema_name}."{source_table_name}"
+            {conflict_clause};
+            DROP TABLE {source_schema_name}."{source_table_name}";
+            """
+        self._execute_query(move_command, cur=cur)
+
+    def _delete_rows_by_key(
+        self, schema_name: str, table_name: str, df_key: pd.DataFrame, cur
+    ) -> NoReturn:
+        if PandasOps.get_row_count(df_key) == 0:
+            return None
+
+        key_table_name = self._get_staging_table_name(f"{table_name}__deleted")
+        self._create_table(
+            schema_name=self._temporary_schema_name,
+            table_name=key_table_name,
+            column_name_type_dict=self._get_dict_of_column_name_to_type_from_dataframe_for_psql(
+                df_key
+            ),
+            cur=cur,
+        )
+        self._insert_df_to_psql(
+            df=df_key,
+            schema_name=self._temporary_schema_name,
+            table_name=key_table_name,
+            cur=cur,
+        )
+
+        key_condition = " AND ".join(
+            [f"t.{col} = d.{col}" for col in df_key.columns.tolist()]
+        )
+        delete_command = f"""
+            DELETE FROM {schema_name}."{table_name}" AS t
+            USING {self._temporary_schema_name}."{key_table_name}" AS d
+            WHERE {key_condition};
+            DROP TABLE {self._temporary_schema_name}."{key_table_name}";
+            """
+        self._execute_query(delete_command, cur=cur)
+
+    def _create_unique_index(
+        self, schema_name: str, table_name: str, column_name_list: list, cur
+    ) -> NoReturn:
+        """
+        Create a unique index on the columns unless the table already has a unique
+        index or constraint on exactly these columns.
+        """
+        check_command = f"""
+            SELECT EXISTS (
+                SELECT 1
+                FROM   pg_index i
+                WHERE  i.indrelid = '{schema_name}."{table_name}"'::regclass
+                AND    i.indisunique
+                AND    i.indpred IS NULL
+                AND    i.indexprs IS NULL
+                AND    (
+                    SELECT array_agg(a.attname::text ORDER BY a.attname)
+                    FROM   pg_attribute a
+                    WHERE  a.attrelid = i.indrelid
+                    AND    a.attnum = ANY(i.indkey)
+                ) = ARRAY{sorted(column_name_list)}::text[]
+            );"""
+        cur.execute(check_command)
+        if cur.fetchone()[0]:
+            return None
+
+        index_name = f"{table_name}_{'_'.join(column_name_list)}_key"[:63]
+        create_command = f"""
+            CREATE UNIQUE INDEX "{index_name}"
+            ON {schema_name}."{table_name}" ({", ".join(column_name_list)});"""
+        self._execute_query(create_command, cur=cur)
 
     def _create_table_as(
         self, query: str, table_name: str, schema_name: str
@@ -167,33 +1444,66 @@ class PsqlConnector(object):
         self._execute_query(query=create_command)
 
     def _create_table(
-        self, schema_name: str, table_name: str, column_name_type_dict: Dict[str, str],
+        self,
+        schema_name: str,
+        table_name: str,
+        column_name_type_dict: Dict[str, str],
+        cur=None,
+        unlogged: bool = False,
     ) -> NoReturn:
+        """
+        Tables in the temporary schema are dropped at the end of the transaction.
+
+        :param unlogged: create the table without writing its rows to the WAL
+        """
         column_types = ", ".join(
             [f"{col_n} {col_t}" for col_n, col_t in column_name_type_dict.items()]
         )
-        create_command = f"""CREATE TABLE IF NOT EXISTS {schema_name}."{table_name}" ({column_types});"""
-        self._execute_query(query=create_command)
+        table_type = "UNLOGGED TABLE" if unlogged else "TABLE"
+        on_commit = ""
+        if schema_name == self._temporary_schema_name:
+            on_commit = " ON COMMIT DROP"
+        create_command = f"""CREATE {table_type} IF NOT EXISTS {schema_name}."{table_name}" ({column_types}){on_commit};"""
+        self._execute_query(query=create_command, cur=cur)
+
+    def _correct_memory_optimized_columns(self, df: pd.DataFrame) -> NoReturn:
+        """
+        Widen the dtypes set by PandasOps.optimize_memory back to 64-bit numbers and
+        object strings, so that table types and row hashes do not depend on it.
+        """
+        for column_name, dtype in df.dtypes.items():
+            if isinstance(dtype, (pd.CategoricalDtype, pd.StringDtype)):
+                df[column_name] = (
+                    df[column_name].astype(object).where(df[column_name].notna(), None)
+                )
+            elif pd.api.types.is_bool_dtype(dtype):
+                continue
+            elif pd.api.types.is_float_dtype(dtype) and (
+                pd.api.types.is_extension_array_dtype(dtype)
+            ):
+                # nullable floats are uploaded as float64 with NaN for missing values
+                df[column_name] = df[column_name].to_numpy(
+                    dtype=np.float64, na_value=np.nan
+                )
+            elif getattr(dtype, "itemsize", 8) >= 8:
+                continue
+            elif pd.api.types.is_integer_dtype(dtype):
+                is_nullable = pd.api.types.is_extension_array_dtype(dtype)
+                df[column_name] = df[column_name].astype(
+                    "Int64" if is_nullable else np.int64
+                )
+            elif pd.api.types.is_float_dtype(dtype):
+                df[column_name] = df[column_name].astype(np.float64)
 
     def _correct_float_columns(self, df: pd.DataFrame) -> NoReturn:
-        float_32_column_list = PandasOps.get_column_names_by_type(
-            df=df, column_dtype="float32"
-        )
-        float_64_column_list = PandasOps.get_column_names_by_type(
-            df=df, column_dtype="float64"
-        )
-        float_column_list = float_32_column_list + float_64_column_list
+        float_column_list = df.select_dtypes(include="floating").columns.tolist()
 
         if len(float_column_list) == 0:
             return None
 
-        for float_col in float_column_list:
-            if PandasOps.contains_all_integer_in_float_column(
-                df=df, column_name=float_col
-            ):
-                df[float_col] = (
-                    df[float_col].fillna(self._csv_null_identifier["int64"]).astype(int)
-                )
+        profile_df = PandasOps.profile_columns(df, column_name_list=float_column_list)
+        for float_col in profile_df.index[profile_df["is_integer"]]:
+            df[float_col] = df[float_col].astype("Int64")
 
     def _get_dict_of_column_name_to_type_from_dataframe_for_psql(
         self, df: pd.DataFrame
@@ -201,24 +1511,26 @@ class PsqlConnector(object):
         pandas_dtype_to_psql_column_type_dict = {
             "int64": "bigint",
             "int32": "bigint",
+            "Int64": "bigint",
+            "Int32": "bigint",
             "float32": "double precision",
             "float64": "double precision",
             "datetime64[ns]": "timestamp",
             "bool": "boolean",
+            "boolean": "boolean",
             "array[object]": "character varying(256)[]",
         }
 
-        pandas_column_name_type_dict = PandasOps.get_dict_of_column_name_to_type(df)
+        profile_df = PandasOps.profile_columns(df)
         psql_column_name_type_dict = dict()
 
-        for k, v in pandas_column_name_type_dict.items():
+        for k, v, max_byte_length in zip(
+            profile_df.index, profile_df["dtype"], profile_df["max_byte_length"]
+        ):
             if v != "object":
                 psql_column_name_type_dict[k] = pandas_dtype_to_psql_column_type_dict[v]
             else:
-                max_character_length = PandasOps.get_maximum_length_of_dtype_object_values(
-                    df=df, column_name=k
-                )
-                max_character_length = math.ceil(1.25 * max_character_length)
+                max_character_length = math.ceil(1.25 * max(max_byte_length, 1))
 
                 if max_character_length <= 2056:
                     psql_column_name_type_dict[
@@ -236,33 +1548,25 @@ class PsqlConnector(object):
             df=df, column_dtype="object"
         )
         for obj_col in object_column_list:
-            df[obj_col] = (
-                df[obj_col]
-                .str.replace("\t", " ", regex=True)
-                .replace("\r\n", "", regex=True)
-                .replace("\n", "", regex=True)
-                .replace('"', "'", regex=True)
-                .replace(",", "|", regex=True)
+            df[obj_col] = df[obj_col].str.translate(
+                self._text_format_translation_table
             )
 
-    def _update_null_in_columns(
-        self,
-        df: pd.DataFrame,
-        column_dtype: Union[np.dtype, str],
-        schema_name: str,
-        table_name: str,
-    ) -> NoReturn:
-        int_columns = PandasOps.get_column_names_by_type(
-            df=df, column_dtype=column_dtype
-        )
-        if len(int_columns) < 1:
-            return None
 
-        update_command = ""
-        for int_col in int_columns:
-            update_command += f"""
-                UPDATE {schema_name}.{table_name}
-                SET {int_col} = NULL
-                WHERE {int_col} = {self._csv_null_identifier[column_dtype]};
-                """
-        self._execute_query(query=update_command)
+def _insert_df_partition_to_psql(
+    connector_kwargs: Dict[str, str],
+    df: pd.DataFrame,
+    schema_name: str,
+    table_name: str,
+    chunk_size: int,
+    format: str,
+    column_name_type_dict: Dict[str, str],
+) -> NoReturn:
+    PsqlConnector(**connector_kwargs)._insert_df_to_psql(
+        df=df,
+        schema_name=schema_name,
+        table_name=table_name,
+        chunk_size=chunk_size,
+        format=format,
+        column_name_type_dict=column_name_type_dict,
+    )
@@ -1,10 +1,21 @@
-import re
 import io
+import re
+import gzip
+import time
+import codecs
+import contextlib
+import concurrent.futures
 import boto3
 import logging
 import pandas as pd
-from typing import NoReturn
+from typing import Dict, Iterable, Iterator, List, NoReturn, Tuple, Union
 from botocore.config import Config
+from GiantPandas import PandasOps
+from GiantPandas.ConcurrentOps import ConcurrentOps
+from GiantPandas.IterStream import IterStream
+from GiantPandas.S3MultipartWriter import S3MultipartWriter
+from GiantPandas.S3RangeReader import S3RangeReader
+from GiantPandas.exceptions import InvalidValue
 
 
 logger = logging.getLogger(__name__)
@@ -12,7 +23,7 @@ logger = logging.getLogger(__name__)
 
 class S3Connector(object):
     """
-    Python module to upload dataframe as csv to S3.
+    Python module to upload dataframe to / read dataframe from S3.
     """
 
     default_config = Config(
@@ -27,6 +38,21 @@ class S3Connector(object):
     default_csv_sep = ","
     default_csv_null_identifier = "#N/A"
 
+    # rows serialized per chunk, bytes per multipart upload part, and number of parts
+    # uploaded concurrently while streaming a dataframe into an object
+    default_chunk_size = 100000
+    default_part_size = 8 * 1024 ** 2
+    default_max_upload_workers = 8
+
+    # csv compression to its Content-Encoding, and rows per parquet row group
+    compression_to_content_encoding_dict = {"gzip": "gzip", "zstd": "zstd"}
+    default_parquet_row_group_size = 500000
+    parquet_content_type = "application/vnd.apache.parquet"
+
+    # number of concurrent range requests while reading an object
+    default_max_download_workers = 8
+    format_allowed_value_list = ["csv", "parquet"]
+
     def __init__(
         self,
         aws_access_key_id: str = None,
@@ -69,7 +95,32 @@ class S3Connector(object):
         include_header: bool = True,
         include_index: bool = False,
         encoding: str = "utf-8-sig",
-    ) -> NoReturn:
+        chunk_size: int = None,
+        part_size: int = None,
+        max_workers: int = None,
+        compression: str = None,
+    ) -> Dict:
+        """
+        Stream the csv into the object, serializing chunk_size rows at a time and
+        uploading parts of part_size bytes with max_workers concurrent requests, so
+        that memory use is bounded by the chunk and part sizes. A failed upload is
+        aborted and leaves no object behind.
+
+        :param compression: "gzip", "zstd" (requires zstandard) or None; the object
+            gets the matching Content-Encoding
+        :return: bucket, object_key, etag and uploaded bytes of the object
+        """
+        extra_args = dict(ContentType="text/csv")
+        if compression is not None:
+            compression = str(compression).lower()
+            if compression not in self.compression_to_content_encoding_dict:
+                raise InvalidValue(
+                    compression, list(self.compression_to_content_encoding_dict.keys())
+                )
+            extra_args["ContentEncoding"] = self.compression_to_content_encoding_dict[
+                compression
+            ]
+
         csv_sep = csv_sep if csv_sep is not None else S3Connector.default_csv_sep
         csv_null_identifier = (
             csv_null_identifier
@@ -77,22 +128,447 @@ class S3Connector(object):
             else S3Connector.default_csv_null_identifier
         )
 
-        # save dataframe as temp csv
-        csv_io = io.StringIO()
-        df.to_csv(
-            csv_io,
-            sep=csv_sep,
-            encoding=encoding,
-            header=include_header,
-            index=include_index,
-            na_rep=csv_null_identifier,
+        with self._get_object_writer(
+            bucket=bucket,
+            object_key=object_key,
+            part_size=part_size,
+            max_workers=max_workers,
+            extra_args=extra_args,
+        ) as writer, self._get_compressed_writer(writer, compression) as csv_writer:
+            for csv_contents in self._iter_csv_chunks(
+                df=df,
+                csv_sep=csv_sep,
+                csv_null_identifier=csv_null_identifier,
+                include_header=include_header,
+                include_index=include_index,
+                encoding=encoding,
+                chunk_size=chunk_size,
+            ):
+                csv_writer.write(csv_contents)
+        logger.info(f"File uploaded: {bucket}/{object_key}")
+        return self._get_upload_result(writer)
+
+    def upload_dataframe_as_parquet(
+        self,
+        df: pd.DataFrame,
+        bucket: str,
+        object_key: str,
+        include_index: bool = False,
+        compression: str = "snappy",
+        row_group_size: int = None,
+        use_dictionary: Union[bool, List[str]] = True,
+        column_encoding: Union[str, Dict[str, str]] = None,
+        part_size: int = None,
+        max_workers: int = None,
+    ) -> Dict:
+        """
+        Stream the dataframe into the object as a parquet file, converting one row
+        group at a time. Requires pyarrow.
+
+        :param compression: parquet compression codec, e.g. "snappy", "gzip", "zstd"
+            or None, either one for all columns or a dict of column name to codec
+        :param row_group_size: number of rows per row group
+        :param use_dictionary: dictionary encode all columns, or only the listed ones
+        :param column_encoding: encoding of all columns, or a dict of column name to
+            encoding, e.g. "DELTA_BINARY_PACKED" or "BYTE_STREAM_SPLIT"; only
+            applies to columns that are not dictionary encoded
+        :return: bucket, object_key, etag and uploaded bytes of the object
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        row_group_size = (
+            row_group_size
+            if row_group_size is not None
+            else self.default_parquet_row_group_size
         )
-        csv_contents = csv_io.getvalue()
-        csv_contents = re.sub(r"NaT", csv_null_identifier, csv_contents)
-        csv_io.seek(0)
-        csv_io.write(csv_contents)
-
-        # copy temp csv file to S3 object
-        self.__resource.Object(bucket, object_key).put(Body=csv_io.getvalue())
-        csv_io.close()
+        schema = pa.Schema.from_pandas(df, preserve_index=include_index)
+
+        with self._get_object_writer(
+            bucket=bucket,
+            object_key=object_key,
+            part_size=part_size,
+            max_workers=max_workers,
+            extra_args=dict(ContentType=self.parquet_content_type),
+        ) as writer, pq.ParquetWriter(
+            writer,
+            schema,
+            compression=compression,
+            use_dictionary=use_dictionary,
+            column_encoding=column_encoding,
+        ) as parquet_writer:
+            for df_chunk in PandasOps.iter_row_chunks(df, chunk_size=row_group_size):
+                parquet_writer.write_table(
+                    pa.Table.from_pandas(
+                        df_chunk, schema=schema, preserve_index=include_index
+                    ),
+                    row_group_size=row_group_size,
+                )
         logger.info(f"File uploaded: {bucket}/{object_key}")
+        return self._get_upload_result(writer)
+
+    def upload_dataframes(
+        self,
+        item_iterable: Iterable[Tuple[pd.DataFrame, str, str]],
+        max_workers: int = None,
+        format: str = "csv",
+        **upload_kwargs,
+    ) -> List[Union[Dict, Exception]]:
+        """
+        Upload many (dataframe, bucket, object_key) items concurrently through the
+        shared client. Items are taken from item_iterable only as workers become
+        free, so at most 2 * max_workers dataframes are held by pending uploads.
+
+        :param max_workers: number of concurrent uploads; the max_pool_connections of
+            the client config if None
+        :param format: "csv" or "parquet"
+        :param upload_kwargs: passed to upload_dataframe_as_csv or
+            upload_dataframe_as_parquet
+        :return: results in the order of the items, each with bucket, object_key,
+            etag, bytes and duration in seconds; an upload that failed has the raised
+            exception in place of its result
+        """
+        format = str(format).lower()
+        if format not in self.format_allowed_value_list:
+            raise InvalidValue(format, self.format_allowed_value_list)
+        upload_function = (
+            self.upload_dataframe_as_parquet
+            if format == "parquet"
+            else self.upload_dataframe_as_csv
+        )
+
+        def __upload(df: pd.DataFrame, bucket: str, object_key: str) -> Dict:
+            start_time = time.perf_counter()
+            result = upload_function(df, bucket, object_key, **upload_kwargs)
+            result["duration"] = time.perf_counter() - start_time
+            return result
+
+        max_workers = max(
+            1,
+            max_workers
+            if max_workers is not None
+            else self.config.max_pool_connections or 10,
+        )
+        result_list = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_list = []
+            for df, bucket, object_key in item_iterable:
+                future = executor.submit(__upload, df, bucket, object_key)
+                future_list.append((len(result_list), future))
+                result_list.append(None)
+                if len(future_list) >= 2 * max_workers:
+                    done_set, _ = concurrent.futures.wait(
+                        [future for _, future in future_list],
+                        return_when=concurrent.futures.FIRST_COMPLETED,
+                    )
+                    future_list = self.__collect_upload_results(
+                        future_list, done_set, result_list
+                    )
+            self.__collect_upload_results(
+                future_list, set(future for _, future in future_list), result_list
+            )
+        return result_list
+
+    @classmethod
+    def __collect_upload_results(
+        cls, future_list: List[Tuple], done_set: set, result_list: List
+    ) -> List[Tuple]:
+        """
+        Store the results of the finished uploads and return the pending ones.
+        """
+        pending_future_list = []
+        for item_index, future in future_list:
+            if future not in done_set:
+                pending_future_list.append((item_index, future))
+                continue
+            try:
+                result_list[item_index] = future.result()
+            except Exception as e:
+                result_list[item_index] = e
+        return pending_future_list
+
+    def get_dataframe_from_s3(
+        self,
+        bucket: str,
+        object_key: str,
+        format: str = None,
+        compression: str = None,
+        column_list: List[str] = None,
+        part_size: int = None,
+        max_workers: int = None,
+        **read_csv_kwargs,
+    ) -> pd.DataFrame:
+        """
+        Read a csv or parquet object into a dataframe. A csv object is fetched as
+        parts of part_size bytes with max_workers concurrent range requests and
+        parsed while it streams in; the row groups of a parquet object are fetched
+        concurrently, each by its own range requests.
+
+        :param format: "csv" or "parquet"; inferred from the content type or the key
+            suffix if None
+        :param compression: compression of a csv object, "gzip" or "zstd"; inferred
+            from the Content-Encoding or the key suffix if None
+        :param column_list: columns to read; only these columns are fetched from a
+            parquet object
+        :param read_csv_kwargs: passed to pandas.read_csv
+        """
+        reader = self._get_object_reader(bucket=bucket, object_key=object_key)
+        format = self._get_object_format(reader=reader, format=format)
+
+        if format == "parquet":
+            import pyarrow as pa
+
+            table_list = list(
+                self._iter_parquet_row_groups(
+                    reader=reader, column_list=column_list, max_workers=max_workers
+                )
+            )
+            if len(table_list) == 0:
+                import pyarrow.parquet as pq
+
+                return pq.read_table(reader, columns=column_list).to_pandas()
+            return pa.concat_tables(table_list).to_pandas()
+
+        with self._open_object_stream(
+            reader=reader,
+            compression=compression,
+            part_size=part_size,
+            max_workers=max_workers,
+        ) as stream:
+            return pd.read_csv(stream, usecols=column_list, **read_csv_kwargs)
+
+    def iter_dataframe_from_s3(
+        self,
+        bucket: str,
+        object_key: str,
+        chunk_size: int = None,
+        format: str = None,
+        compression: str = None,
+        column_list: List[str] = None,
+        part_size: int = None,
+        max_workers: int = None,
+        **read_csv_kwargs,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Iterate over a csv or parquet object in dataframes of at most chunk_size
+        rows, fetched as in get_dataframe_from_s3. Only the parts or row groups that
+        are being read or fetched ahead are held in memory.
+        """
+        chunk_size = chunk_size if chunk_size is not None else self.default_chunk_size
+        reader = self._get_object_reader(bucket=bucket, object_key=object_key)
+        format = self._get_object_format(reader=reader, format=format)
+
+        if format == "parquet":
+            import pyarrow as pa
+
+            for table in self._iter_parquet_row_groups(
+                reader=reader, column_list=column_list, max_workers=max_workers
+            ):
+                for batch in table.to_batches(max_chunksize=chunk_size):
+                    yield pa.Table.from_batches([batch]).to_pandas()
+            return None
+
+        with self._open_object_stream(
+            reader=reader,
+            compression=compression,
+            part_size=part_size,
+            max_workers=max_workers,
+        ) as stream:
+            for df_chunk in pd.read_csv(
+                stream, usecols=column_list, chunksize=chunk_size, **read_csv_kwargs
+            ):
+                yield df_chunk
+
+    @contextlib.contextmanager
+    def open_object_stream(
+        self,
+        bucket: str,
+        object_key: str,
+        compression: str = None,
+        part_size: int = None,
+        max_workers: int = None,
+    ) -> Iterator[io.IOBase]:
+        """
+        Yield a readable binary stream of the decompressed object, fetched as in
+        get_dataframe_from_s3.
+        """
+        reader = self._get_object_reader(bucket=bucket, object_key=object_key)
+        with self._open_object_stream(
+            reader=reader,
+            compression=compression,
+            part_size=part_size,
+            max_workers=max_workers,
+        ) as stream:
+            yield stream
+
+    def _get_object_reader(self, bucket: str, object_key: str) -> S3RangeReader:
+        return S3RangeReader(
+            self.__resource.meta.client, bucket=bucket, object_key=object_key
+        )
+
+    def _get_object_format(self, reader: S3RangeReader, format: str = None) -> str:
+        if format is None:
+            if reader.content_type == self.parquet_content_type or (
+                reader.object_key.lower().endswith((".parquet", ".pq"))
+            ):
+                return "parquet"
+            return "csv"
+
+        format = str(format).lower()
+        if format not in self.format_allowed_value_list:
+            raise InvalidValue(format, self.format_allowed_value_list)
+        return format
+
+    def _get_object_compression(
+        self, reader: S3RangeReader, compression: str = None
+    ) -> str:
+        if compression is None:
+            if reader.content_encoding in self.compression_to_content_encoding_dict:
+                return reader.content_encoding
+            if reader.object_key.lower().endswith(".gz"):
+                return "gzip"
+            if reader.object_key.lower().endswith(".zst"):
+                return "zstd"
+            return None
+
+        compression = str(compression).lower()
+        if compression not in self.compression_to_content_encoding_dict:
+            raise InvalidValue(
+                compression, list(self.compression_to_content_encoding_dict.keys())
+            )
+        return compression
+
+    @contextlib.contextmanager
+    def _open_object_stream(
+        self,
+        reader: S3RangeReader,
+        compression: str = None,
+        part_size: int = None,
+        max_workers: int = None,
+    ) -> Iterator[io.IOBase]:
+        """
+        Yield a decompressed stream of the object, fed by concurrent range requests.
+        """
+        compression = self._get_object_compression(
+            reader=reader, compression=compression
+        )
+        chunk_iterator = reader.iter_chunks(
+            part_size=part_size if part_size is not None else self.default_part_size,
+            max_workers=max_workers
+            if max_workers is not None
+            else self.default_max_download_workers,
+        )
+        stream = io.BufferedReader(IterStream(chunk_iterator))
+        try:
+            if compression == "gzip":
+                yield gzip.GzipFile(fileobj=stream, mode="rb")
+            elif compression == "zstd":
+                import zstandard
+
+                yield zstandard.ZstdDecompressor().stream_reader(
+                    stream, read_across_frames=True, closefd=False
+                )
+            else:
+                yield stream
+        finally:
+            stream.close()
+            chunk_iterator.close()
+
+    def _iter_parquet_row_groups(
+        self,
+        reader: S3RangeReader,
+        column_list: List[str] = None,
+        max_workers: int = None,
+    ) -> Iterator:
+        """
+        Yield the row groups of a parquet object in order as pyarrow tables, read
+        ahead of the consumer by max_workers threads with their own readers.
+        """
+        import pyarrow.parquet as pq
+
+        max_workers = (
+            max_workers
+            if max_workers is not None
+            else self.default_max_download_workers
+        )
+        metadata = pq.ParquetFile(reader).metadata
+
+        def __read_row_group(row_group_index: int):
+            return pq.ParquetFile(reader.duplicate(), metadata=metadata).read_row_group(
+                row_group_index, columns=column_list
+            )
+
+        yield from ConcurrentOps.iter_ordered_map(
+            __read_row_group, range(metadata.num_row_groups), max_workers=max_workers
+        )
+
+    def _get_object_writer(
+        self,
+        bucket: str,
+        object_key: str,
+        part_size: int = None,
+        max_workers: int = None,
+        extra_args: dict = None,
+    ) -> S3MultipartWriter:
+        # the resource is not thread-safe, unlike its client
+        return S3MultipartWriter(
+            self.__resource.meta.client,
+            bucket=bucket,
+            object_key=object_key,
+            part_size=part_size
+            if part_size is not None
+            else S3Connector.default_part_size,
+            max_workers=max_workers
+            if max_workers is not None
+            else S3Connector.default_max_upload_workers,
+            extra_args=extra_args,
+        )
+
+    @classmethod
+    def _get_upload_result(cls, writer: S3MultipartWriter) -> Dict:
+        return dict(
+            bucket=writer.bucket,
+            object_key=writer.object_key,
+            etag=writer.etag,
+            bytes=writer.bytes_written,
+        )
+
+    def _get_compressed_writer(self, writer: S3MultipartWriter, compression: str):
+        if compression == "gzip":
+            return gzip.GzipFile(fileobj=writer, mode="wb", compresslevel=6)
+        if compression == "zstd":
+            import zstandard
+
+            return zstandard.ZstdCompressor().stream_writer(writer, closefd=False)
+        return contextlib.nullcontext(writer)
+
+    def _iter_csv_chunks(
+        self,
+        df: pd.DataFrame,
+        csv_sep: str,
+        csv_null_identifier: str,
+        include_header: bool,
+        include_index: bool,
+        encoding: str,
+        chunk_size: int = None,
+    ) -> Iterator[bytes]:
+        chunk_size = chunk_size if chunk_size is not None else self.default_chunk_size
+
+        # a single incremental encoder writes a byte order mark only once
+        encoder = codecs.getincrementalencoder(encoding)()
+        chunk_iterator = PandasOps.iter_row_chunks(df, chunk_size=max(1, chunk_size))
+        for chunk_index, df_chunk in enumerate(chunk_iterator):
+            csv_contents = df_chunk.to_csv(
+                sep=csv_sep,
+                header=include_header and chunk_index == 0,
+                index=include_index,
+                na_rep=csv_null_identifier,
+            )
+            csv_contents = re.sub(r"NaT", csv_null_identifier, csv_contents)
+            yield encoder.encode(csv_contents)
+
+        if PandasOps.get_row_count(df) == 0:
+            yield encoder.encode(
+                df.to_csv(sep=csv_sep, header=include_header, index=include_index)
+            )
+        yield encoder.encode("", final=True)
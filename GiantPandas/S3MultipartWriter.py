@@ -0,0 +1,168 @@
+import io
+import concurrent.futures
+from typing import Dict, List, NoReturn
+
+
+class S3MultipartWriter(io.RawIOBase):
+    """
+    Write-only file-like object streaming its contents into an S3 object.
+
+    Written bytes are buffered into parts of part_size bytes, which are uploaded as a
+    multipart upload by at most max_workers threads, so at most about
+    2 * max_workers + 1 parts are held in memory. Contents smaller than one part are
+    sent with a single put. The upload is completed on close and aborted if any part
+    fails or the writer is left through an exception.
+    """
+
+    # S3 rejects parts smaller than 5 MiB, except for the last one
+    _minimum_part_size = 5 * 1024 ** 2
+
+    def __init__(
+        self,
+        client,
+        bucket: str,
+        object_key: str,
+        part_size: int = 8 * 1024 ** 2,
+        max_workers: int = 4,
+        extra_args: Dict[str, str] = None,
+    ) -> NoReturn:
+        """
+        :param client: boto3 S3 client, shared by the upload threads
+        :param extra_args: additional arguments of the put / multipart upload request,
+            e.g. ContentType
+        """
+        super().__init__()
+        self.client = client
+        self.bucket = bucket
+        self.object_key = object_key
+        self.part_size = max(part_size, self._minimum_part_size)
+        self.max_workers = max(1, max_workers)
+        self.extra_args = dict(extra_args or {})
+
+        self.__buffer = bytearray()
+        self.__upload_id = None
+        self.__executor = None
+        self.__future_list = []
+        self.__part_list = []
+        self.__part_count = 0
+        self.bytes_written = 0
+        self.etag = None
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.bytes_written
+
+    def write(self, b) -> int:
+        if self.closed:
+            raise ValueError("write to closed file")
+
+        self.__buffer += b
+        self.bytes_written += len(b)
+        while len(self.__buffer) >= self.part_size:
+            part = bytes(self.__buffer[: self.part_size])
+            del self.__buffer[: self.part_size]
+            self.__submit_part(part)
+        return len(b)
+
+    def __submit_part(self, part: bytes) -> NoReturn:
+        try:
+            if self.__upload_id is None:
+                self.__upload_id = self.client.create_multipart_upload(
+                    Bucket=self.bucket, Key=self.object_key, **self.extra_args
+                )["UploadId"]
+                self.__executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers
+                )
+
+            # wait for a running upload to finish before buffering more parts
+            self.__collect_parts(max_pending=2 * self.max_workers - 1)
+            self.__part_count += 1
+            self.__future_list.append(
+                self.__executor.submit(self.__upload_part, self.__part_count, part)
+            )
+        except BaseException:
+            self.abort()
+            raise
+
+    def __upload_part(self, part_number: int, part: bytes) -> Dict:
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=self.object_key,
+            UploadId=self.__upload_id,
+            PartNumber=part_number,
+            Body=part,
+        )
+        return dict(PartNumber=part_number, ETag=response["ETag"])
+
+    def __collect_parts(self, max_pending: int = 0) -> NoReturn:
+        while len(self.__future_list) > max_pending:
+            done_set, _ = concurrent.futures.wait(
+                self.__future_list, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done_set:
+                self.__part_list.append(future.result())
+            self.__future_list = [f for f in self.__future_list if f not in done_set]
+
+    def get_parts(self) -> List[Dict]:
+        return sorted(self.__part_list, key=lambda part: part["PartNumber"])
+
+    def close(self) -> NoReturn:
+        """
+        Upload the remaining contents and complete the upload.
+        """
+        if self.closed:
+            return None
+
+        try:
+            if self.__upload_id is None:
+                response = self.client.put_object(
+                    Bucket=self.bucket,
+                    Key=self.object_key,
+                    Body=bytes(self.__buffer),
+                    **self.extra_args,
+                )
+            else:
+                if len(self.__buffer) > 0:
+                    self.__submit_part(bytes(self.__buffer))
+                self.__collect_parts()
+                response = self.client.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=self.object_key,
+                    UploadId=self.__upload_id,
+                    MultipartUpload={"Parts": self.get_parts()},
+                )
+                self.__executor.shutdown()
+            self.etag = response["ETag"]
+        except BaseException:
+            self.abort()
+            raise
+        finally:
+            self.__buffer = bytearray()
+            super().close()
+
+    def abort(self) -> NoReturn:
+        """
+        Discard the contents and abort the multipart upload, if one was started.
+        """
+        if self.__executor is not None:
+            for future in self.__future_list:
+                future.cancel()
+            self.__executor.shutdown(wait=True)
+            self.__executor = None
+        self.__future_list = []
+
+        if self.__upload_id is not None:
+            upload_id, self.__upload_id = self.__upload_id, None
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket, Key=self.object_key, UploadId=upload_id
+            )
+        self.__buffer = bytearray()
+        super().close()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> NoReturn:
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
@@ -0,0 +1,124 @@
+import io
+from typing import Iterator, NoReturn
+from GiantPandas.ConcurrentOps import ConcurrentOps
+
+
+class S3RangeReader(io.RawIOBase):
+    """
+    Seekable read-only file-like object over an S3 object, fetching byte ranges on
+    demand. Every range is requested with the ETag of the object, so a read fails
+    instead of mixing versions if the object is replaced meanwhile.
+    """
+
+    def __init__(
+        self,
+        client,
+        bucket: str,
+        object_key: str,
+        read_ahead: int = 64 * 1024,
+        head_response: dict = None,
+    ) -> NoReturn:
+        """
+        :param client: boto3 S3 client, shared by the download threads
+        :param read_ahead: minimum number of bytes fetched per read, so that small
+            reads do not each cost a request
+        :param head_response: response of head_object for the object; requested if
+            None
+        """
+        super().__init__()
+        self.client = client
+        self.bucket = bucket
+        self.object_key = object_key
+        self.read_ahead = read_ahead
+
+        if head_response is None:
+            head_response = self.client.head_object(
+                Bucket=self.bucket, Key=self.object_key
+            )
+        self.__head_response = head_response
+        self.size = head_response["ContentLength"]
+        self.etag = head_response["ETag"]
+        self.content_type = head_response.get("ContentType")
+        self.content_encoding = head_response.get("ContentEncoding")
+
+        self.__position = 0
+        self.__buffer = b""
+        self.__buffer_start = 0
+
+    def duplicate(self) -> "S3RangeReader":
+        """
+        :return: reader of the same object version with its own position, e.g. for
+            another thread
+        """
+        return S3RangeReader(
+            self.client,
+            self.bucket,
+            self.object_key,
+            read_ahead=self.read_ahead,
+            head_response=self.__head_response,
+        )
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.__position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self.__position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"invalid whence ({whence})")
+        if position < 0:
+            raise ValueError(f"negative seek position {position}")
+        self.__position = position
+        return self.__position
+
+    def get_range(self, start: int, end: int) -> bytes:
+        """
+        :return: bytes from start up to, but excluding, end
+        """
+        end = min(end, self.size)
+        if start >= end:
+            return b""
+        return self.client.get_object(
+            Bucket=self.bucket,
+            Key=self.object_key,
+            Range=f"bytes={start}-{end - 1}",
+            IfMatch=self.etag,
+        )["Body"].read()
+
+    def readinto(self, b) -> int:
+        size = min(len(b), self.size - self.__position)
+        if size <= 0:
+            return 0
+
+        buffer_offset = self.__position - self.__buffer_start
+        if buffer_offset < 0 or buffer_offset + size > len(self.__buffer):
+            self.__buffer = self.get_range(
+                self.__position, self.__position + max(size, self.read_ahead)
+            )
+            self.__buffer_start = self.__position
+            buffer_offset = 0
+
+        b[:size] = self.__buffer[buffer_offset : buffer_offset + size]
+        self.__position += size
+        return size
+
+    def iter_chunks(self, part_size: int, max_workers: int = 4) -> Iterator[bytes]:
+        """
+        Yield the whole object in order, as parts of part_size bytes fetched ahead of
+        the consumer by max_workers concurrent range requests.
+        """
+        yield from ConcurrentOps.iter_ordered_map(
+            lambda start: self.get_range(start, start + part_size),
+            range(0, self.size, max(1, part_size)),
+            max_workers=max_workers,
+        )
@@ -0,0 +1,541 @@
+import re
+import sys
+import types
+import zipfile
+import datetime
+import posixpath
+import numpy as np
+import pandas as pd
+import xml.etree.ElementTree as ElementTree
+from typing import Dict, Iterator, List, NoReturn, Tuple, Union
+from GiantPandas.exceptions import InvalidValue
+
+
+class XlsxReader(object):
+    """
+    Python module to stream rows out of an xlsx file with an iterative xml parser.
+
+    Only the shared strings, the number formats and the workbook metadata are held in
+    memory; the rows of a sheet are parsed and discarded one at a time.
+    """
+
+    _relationship_namespace = (
+        "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+    )
+
+    # built-in number formats of dates and times
+    _date_number_format_id_set = set(range(14, 23)) | set(range(45, 48))
+
+    # quoted text, escaped characters and bracketed colors / conditions are no date
+    # tokens, but elapsed time formats such as [h]:mm are
+    _number_format_literal_pattern = re.compile(r'"[^"]*"|\\.|\[(?![hms]+\])[^\]]*\]')
+    _number_format_date_token_pattern = re.compile(r"[dmyhs]", flags=re.IGNORECASE)
+
+    _column_letters_to_index_dict = dict()
+
+    # bytes of a sheet fed to the parser at a time
+    _sheet_read_size = 1024 ** 2
+
+    def __init__(self, file_path: str) -> NoReturn:
+        """
+        Only the workbook metadata is read here; the shared strings and number
+        formats are read once, when the first cells are decoded.
+        """
+        self.file_path = file_path
+
+        with zipfile.ZipFile(self.file_path) as zip_file:
+            self.sheet_name_to_path_dict = self._get_dict_of_sheet_name_to_path(
+                zip_file
+            )
+            self.is_1904_date_system = self._is_1904_date_system(zip_file)
+        self.__date_style_index_set = None
+        self.__shared_string_list = None
+
+    @property
+    def date_style_index_set(self) -> set:
+        self.load_cell_contents()
+        return self.__date_style_index_set
+
+    @property
+    def shared_string_list(self) -> List[str]:
+        self.load_cell_contents()
+        return self.__shared_string_list
+
+    def load_cell_contents(self) -> NoReturn:
+        """
+        Read the shared strings and number formats, unless they were read already.
+        Loaded readers can be passed to other processes without reading them again.
+        """
+        if self.__shared_string_list is not None:
+            return None
+        with zipfile.ZipFile(self.file_path) as zip_file:
+            self.__date_style_index_set = self._get_date_style_index_set(zip_file)
+            self.__shared_string_list = self._get_shared_string_list(zip_file)
+
+    def get_sheet_names(self) -> List[str]:
+        return list(self.sheet_name_to_path_dict.keys())
+
+    def get_sheet_dimensions(self) -> Dict[str, Tuple[int, int]]:
+        """
+        :return: dict of sheet name to its number of rows and columns
+        """
+        return {
+            sheet_name: self.get_sheet_dimension(sheet_name)
+            for sheet_name in self.get_sheet_names()
+        }
+
+    def get_sheet_dimension(
+        self, sheet_name: Union[int, str] = None
+    ) -> Tuple[int, int]:
+        """
+        Return the number of rows and columns of the used range of a sheet, as
+        recorded in the sheet, without parsing its cells; (0, 0) if it is not
+        recorded.
+        """
+        with zipfile.ZipFile(self.file_path) as zip_file:
+            with zip_file.open(self._get_sheet_path(sheet_name)) as sheet_file:
+                for _, element in ElementTree.iterparse(sheet_file, events=("start",)):
+                    local_name = element.tag.rsplit("}", 1)[-1]
+                    if local_name == "dimension":
+                        return self._get_dimension_from_reference(element.get("ref"))
+                    if local_name == "sheetData":
+                        break
+        return 0, 0
+
+    @classmethod
+    def _get_dimension_from_reference(cls, reference: str) -> Tuple[int, int]:
+        last_cell_reference = reference.split(":")[-1]
+        column_letters = last_cell_reference.rstrip("0123456789")
+        row_digits = last_cell_reference[len(column_letters) :]
+        return (
+            int(row_digits) if row_digits else 0,
+            cls._get_column_index(column_letters, -1) + 1,
+        )
+
+    def iter_rows(
+        self, sheet_name: Union[int, str] = None, skip_rows_list: List[int] = None
+    ) -> Iterator[list]:
+        """
+        Yield the cell values of each row, with None for empty cells. Empty rows
+        between rows with values are yielded as empty lists.
+
+        :param skip_rows_list: 0-based indices of rows that are not yielded
+        """
+        skip_row_set = set(skip_rows_list or [])
+        with zipfile.ZipFile(self.file_path) as zip_file:
+            with zip_file.open(self._get_sheet_path(sheet_name)) as sheet_file:
+                row_index = 0
+                for row_number, row in self._iter_sheet_rows(sheet_file):
+                    while row_index < row_number - 1:
+                        if row_index not in skip_row_set:
+                            yield []
+                        row_index += 1
+                    if row_index not in skip_row_set:
+                        yield row
+                    row_index += 1
+
+    def iter_dataframe(
+        self,
+        sheet_name: Union[int, str] = None,
+        chunk_size: int = 100000,
+        usecols: List[Union[int, str]] = None,
+        dtype: Union[str, Dict[str, str]] = None,
+        skip_rows_list: List[int] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Yield the rows below the header row in dataframes of at most chunk_size rows.
+        Trailing empty rows are dropped, as in pandas.read_excel.
+
+        Every chunk has the same dtypes, inferred from the first chunk and widened to
+        hold missing values: Int64 for integers, boolean for booleans, and object for
+        columns without values in the first chunk.
+
+        :param usecols: names or 0-based positions of the columns to keep
+        :param dtype: dtype, or dict of column name to dtype, of the columns
+        """
+        column_dtype_dict = None
+        for df in self._iter_untyped_dataframe(
+            sheet_name, chunk_size, usecols, skip_rows_list
+        ):
+            if column_dtype_dict is None:
+                column_dtype_dict = self._get_column_dtypes(df, dtype)
+            yield self._get_dataframe_with_dtypes(df, column_dtype_dict, dtype)
+
+    def get_dataframe(
+        self,
+        sheet_name: Union[int, str] = None,
+        usecols: List[Union[int, str]] = None,
+        dtype: Union[str, Dict[str, str]] = None,
+        skip_rows_list: List[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Read the rows below the header row at once, with dtypes inferred from all
+        values as in pandas.read_excel.
+
+        :return: None if the sheet has no header row
+        """
+        df = next(
+            self._iter_untyped_dataframe(
+                sheet_name, sys.maxsize, usecols, skip_rows_list
+            ),
+            None,
+        )
+        if df is not None and dtype is not None:
+            df = df.astype(dtype)
+        return df
+
+    def _iter_untyped_dataframe(
+        self,
+        sheet_name: Union[int, str],
+        chunk_size: int,
+        usecols: List[Union[int, str]],
+        skip_rows_list: List[int],
+    ) -> Iterator[pd.DataFrame]:
+        row_iterator = self.iter_rows(
+            sheet_name=sheet_name, skip_rows_list=skip_rows_list
+        )
+        header = next(row_iterator, None)
+        if header is None:
+            return None
+
+        column_count = self.get_sheet_dimension(sheet_name=sheet_name)[1]
+        if column_count > len(header):
+            header = header + [None] * (column_count - len(header))
+        column_name_list = self._get_column_names(header)
+        column_index_list = list(range(len(column_name_list)))
+        if usecols is not None:
+            column_index_list = [
+                column if isinstance(column, int) else column_name_list.index(column)
+                for column in usecols
+            ]
+            column_name_list = [column_name_list[i] for i in column_index_list]
+
+        row_list = []
+        empty_row_list = []
+        has_yielded = False
+        for row in row_iterator:
+            row = [row[i] if i < len(row) else None for i in column_index_list]
+            if all(value is None for value in row):
+                empty_row_list.append(row)
+                continue
+            row_list.extend(empty_row_list)
+            empty_row_list = []
+            row_list.append(row)
+            if len(row_list) >= chunk_size:
+                yield self._get_dataframe_from_rows(
+                    row_list[:chunk_size], column_name_list
+                )
+                row_list = row_list[chunk_size:]
+                has_yielded = True
+
+        # a sheet with a header row only still yields its columns
+        if len(row_list) > 0 or not has_yielded:
+            yield self._get_dataframe_from_rows(row_list, column_name_list)
+
+    @classmethod
+    def _get_dataframe_from_rows(
+        cls, row_list: List[list], column_name_list: List[str]
+    ) -> pd.DataFrame:
+        # empty cells become NaN, as in pandas.read_excel
+        df = pd.DataFrame.from_records(row_list, columns=column_name_list)
+        return df.fillna(np.nan)
+
+    @classmethod
+    def _get_column_dtypes(
+        cls, df: pd.DataFrame, dtype: Union[str, Dict[str, str]]
+    ) -> Dict[str, str]:
+        """
+        Dtypes of the columns without a dtype given, from the values of the first
+        chunk; a value of a later chunk can be missing even if none of these is.
+        """
+        if dtype is not None and not isinstance(dtype, dict):
+            return dict()
+
+        column_dtype_dict = dict()
+        for column_name, column_dtype in df.dtypes.items():
+            if dtype is not None and column_name in dtype:
+                continue
+            if df[column_name].isna().all():
+                column_dtype_dict[column_name] = "object"
+            elif pd.api.types.is_bool_dtype(column_dtype):
+                column_dtype_dict[column_name] = "boolean"
+            elif pd.api.types.is_integer_dtype(column_dtype):
+                column_dtype_dict[column_name] = "Int64"
+            elif pd.api.types.is_float_dtype(column_dtype):
+                column_dtype_dict[column_name] = "float64"
+            elif pd.api.types.is_datetime64_dtype(column_dtype):
+                column_dtype_dict[column_name] = "datetime64[ns]"
+            else:
+                column_dtype_dict[column_name] = "object"
+        return column_dtype_dict
+
+    @classmethod
+    def _get_dataframe_with_dtypes(
+        cls,
+        df: pd.DataFrame,
+        column_dtype_dict: Dict[str, str],
+        dtype: Union[str, Dict[str, str]],
+    ) -> pd.DataFrame:
+        for column_name, column_dtype in column_dtype_dict.items():
+            try:
+                df[column_name] = df[column_name].astype(column_dtype)
+            except (TypeError, ValueError):
+                # e.g. text or fractions below whole numbers, kept as they are
+                df[column_name] = df[column_name].astype(object)
+        if dtype is not None:
+            df = df.astype(dtype)
+        return df
+
+    @classmethod
+    def _get_column_names(cls, header: list) -> List[str]:
+        """
+        Name empty and repeated header cells the way pandas.read_excel does.
+        """
+        column_name_list = []
+        for index, value in enumerate(header):
+            if value is None:
+                column_name = f"Unnamed: {index}"
+            elif isinstance(value, float) and value.is_integer():
+                column_name = int(value)
+            else:
+                column_name = value
+            duplicate_count = 0
+            unique_column_name = column_name
+            while unique_column_name in column_name_list:
+                duplicate_count += 1
+                unique_column_name = f"{column_name}.{duplicate_count}"
+            column_name_list.append(unique_column_name)
+        return column_name_list
+
+    def _get_sheet_path(self, sheet_name: Union[int, str] = None) -> str:
+        if sheet_name is None:
+            sheet_name = 0
+        sheet_name_list = self.get_sheet_names()
+        if isinstance(sheet_name, int):
+            if not 0 <= sheet_name < len(sheet_name_list):
+                raise InvalidValue(sheet_name, list(range(len(sheet_name_list))))
+            sheet_name = sheet_name_list[sheet_name]
+        if sheet_name not in self.sheet_name_to_path_dict:
+            raise InvalidValue(sheet_name, sheet_name_list)
+        return self.sheet_name_to_path_dict[sheet_name]
+
+    def _iter_sheet_rows(self, sheet_file) -> Iterator[tuple]:
+        """
+        Yield (1-based row number, cell values) of each row of a sheet. The sheet is
+        fed in blocks to a parser calling back into this method, so no element tree
+        is built and memory use stays flat.
+        """
+        date_style_set = set(str(index) for index in self.date_style_index_set)
+        local_name_dict = dict()
+        finished_row_list = []
+        row = []
+        row_number = 0
+        cell_reference = cell_type = cell_style = None
+        text_list = None
+        is_text = is_phonetic = False
+
+        def __get_local_name(tag: str) -> str:
+            if tag not in local_name_dict:
+                local_name_dict[tag] = tag.rsplit("}", 1)[-1]
+            return local_name_dict[tag]
+
+        def __start(tag: str, attrib: dict) -> NoReturn:
+            nonlocal row, row_number, cell_reference, cell_type, cell_style
+            nonlocal text_list, is_text, is_phonetic
+            local_name = __get_local_name(tag)
+            if local_name == "c":
+                cell_reference = attrib.get("r")
+                cell_type = attrib.get("t", "n")
+                cell_style = attrib.get("s")
+                text_list = None
+            elif local_name == "v" or (local_name == "t" and not is_phonetic):
+                is_text = True
+                if text_list is None:
+                    text_list = []
+            elif local_name == "rPh":
+                is_phonetic = True
+            elif local_name == "row":
+                row_number = int(attrib.get("r", row_number + 1))
+                row = []
+
+        def __data(text: str) -> NoReturn:
+            if is_text:
+                text_list.append(text)
+
+        def __end(tag: str) -> NoReturn:
+            nonlocal is_text, is_phonetic
+            local_name = local_name_dict[tag]
+            if local_name == "v" or local_name == "t":
+                is_text = False
+            elif local_name == "rPh":
+                is_phonetic = False
+            elif local_name == "c":
+                column_index = self._get_column_index(cell_reference, len(row))
+                if column_index > len(row):
+                    row.extend([None] * (column_index - len(row)))
+                row.append(
+                    self._get_cell_value(
+                        cell_type=cell_type,
+                        is_date=cell_style in date_style_set,
+                        value_text=None if text_list is None else "".join(text_list),
+                    )
+                )
+            elif local_name == "row":
+                finished_row_list.append((row_number, row))
+
+        parser = ElementTree.XMLParser(
+            target=types.SimpleNamespace(start=__start, data=__data, end=__end)
+        )
+        for block in iter(lambda: sheet_file.read(self._sheet_read_size), b""):
+            parser.feed(block)
+            yield from finished_row_list
+            finished_row_list.clear()
+        parser.close()
+        yield from finished_row_list
+
+    @classmethod
+    def _get_column_index(cls, cell_reference: str, default_index: int) -> int:
+        if cell_reference is None:
+            return default_index
+        column_letters = cell_reference.rstrip("0123456789")
+        if column_letters not in cls._column_letters_to_index_dict:
+            column_index = 0
+            for letter in column_letters:
+                column_index = column_index * 26 + ord(letter) - ord("A") + 1
+            cls._column_letters_to_index_dict[column_letters] = column_index - 1
+        return cls._column_letters_to_index_dict[column_letters]
+
+    def _get_cell_value(self, cell_type: str, is_date: bool, value_text: str):
+        if value_text is None:
+            return None
+        if cell_type == "n":
+            value = float(value_text)
+            if is_date:
+                return self._get_datetime_from_serial(value)
+            if value.is_integer():
+                return int(value)
+            return value
+        if cell_type == "s":
+            return self.__shared_string_list[int(value_text)]
+        if cell_type == "b":
+            return value_text == "1"
+        if cell_type == "e":
+            return None
+        if cell_type == "d":
+            return pd.Timestamp(value_text).to_pydatetime()
+        return value_text
+
+    def _get_datetime_from_serial(self, value: float) -> datetime.datetime:
+        epoch = (
+            datetime.datetime(1904, 1, 1)
+            if self.is_1904_date_system
+            else datetime.datetime(1899, 12, 30)
+        )
+        return epoch + datetime.timedelta(milliseconds=round(value * 86400000))
+
+    @classmethod
+    def _get_text(cls, element: ElementTree.Element) -> str:
+        """
+        Concatenate the text runs of a string item, without phonetic runs.
+        """
+        text_list = []
+        for child in element:
+            local_name = child.tag.rsplit("}", 1)[-1]
+            if local_name == "t":
+                text_list.append(child.text or "")
+            elif local_name == "r":
+                text_list.append(cls._get_text(child))
+        return "".join(text_list)
+
+    @classmethod
+    def _get_dict_of_sheet_name_to_path(
+        cls, zip_file: zipfile.ZipFile
+    ) -> Dict[str, str]:
+        relationship_id_to_path_dict = dict()
+        relationships = ElementTree.fromstring(
+            zip_file.read("xl/_rels/workbook.xml.rels")
+        )
+        for relationship in relationships:
+            target = relationship.get("Target")
+            if target.startswith("/"):
+                path = target.lstrip("/")
+            else:
+                path = posixpath.normpath(posixpath.join("xl", target))
+            relationship_id_to_path_dict[relationship.get("Id")] = path
+
+        sheet_name_to_path_dict = dict()
+        workbook = ElementTree.fromstring(zip_file.read("xl/workbook.xml"))
+        for element in workbook.iter():
+            if element.tag.rsplit("}", 1)[-1] != "sheet":
+                continue
+            relationship_id = element.get(f"{{{cls._relationship_namespace}}}id")
+            sheet_name_to_path_dict[element.get("name")] = relationship_id_to_path_dict[
+                relationship_id
+            ]
+        return sheet_name_to_path_dict
+
+    @classmethod
+    def _is_1904_date_system(cls, zip_file: zipfile.ZipFile) -> bool:
+        workbook = ElementTree.fromstring(zip_file.read("xl/workbook.xml"))
+        for element in workbook.iter():
+            if element.tag.rsplit("}", 1)[-1] == "workbookPr":
+                return element.get("date1904", "false").lower() in ["1", "true"]
+        return False
+
+    @classmethod
+    def _get_date_style_index_set(cls, zip_file: zipfile.ZipFile) -> set:
+        """
+        Return the indices of the cell formats whose number format shows a date or
+        a time.
+        """
+        if "xl/styles.xml" not in zip_file.namelist():
+            return set()
+
+        styles = ElementTree.fromstring(zip_file.read("xl/styles.xml"))
+        date_number_format_id_set = set(cls._date_number_format_id_set)
+        cell_format_list = []
+        for element in styles:
+            local_name = element.tag.rsplit("}", 1)[-1]
+            if local_name == "numFmts":
+                for number_format in element:
+                    if cls._is_date_number_format(number_format.get("formatCode", "")):
+                        date_number_format_id_set.add(
+                            int(number_format.get("numFmtId"))
+                        )
+            elif local_name == "cellXfs":
+                cell_format_list = [int(xf.get("numFmtId", 0)) for xf in element]
+
+        return set(
+            index
+            for index, number_format_id in enumerate(cell_format_list)
+            if number_format_id in date_number_format_id_set
+        )
+
+    @classmethod
+    def _is_date_number_format(cls, format_code: str) -> bool:
+        # only the format of positive numbers decides
+        format_code = cls._number_format_literal_pattern.sub(
+            "", format_code.split(";")[0]
+        )
+        return cls._number_format_date_token_pattern.search(format_code) is not None
+
+    @classmethod
+    def _get_shared_string_list(cls, zip_file: zipfile.ZipFile) -> List[str]:
+        if "xl/sharedStrings.xml" not in zip_file.namelist():
+            return []
+
+        shared_string_list = []
+        shared_string_table = None
+        with zip_file.open("xl/sharedStrings.xml") as shared_strings_file:
+            for event, element in ElementTree.iterparse(
+                shared_strings_file, events=("start", "end")
+            ):
+                local_name = element.tag.rsplit("}", 1)[-1]
+                if event == "start":
+                    if local_name == "sst":
+                        shared_string_table = element
+                elif local_name == "si":
+                    shared_string_list.append(cls._get_text(element))
+                    element.clear()
+                    shared_string_table.remove(element)
+        return shared_string_list
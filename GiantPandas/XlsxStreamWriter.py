@@ -0,0 +1,148 @@
+import datetime
+import xlsxwriter
+import pandas as pd
+from typing import Iterable, List, NoReturn, Union
+from GiantPandas import PandasOps
+
+
+class XlsxStreamWriter(object):
+    """
+    Python module to stream dataframes into an xlsx file with xlsxwriter in
+    constant_memory mode.
+
+    Every row is flushed to a temporary file as soon as the next one is written, so
+    memory use does not grow with the number of rows. Rows beyond the row limit of a
+    sheet are continued on new sheets named sheet_2, sheet_3, ...
+    """
+
+    # rows per sheet, including the header row
+    _max_sheet_row_count = 1048576
+    _max_sheet_name_length = 31
+    _default_chunk_size = 100000
+
+    _header_format_dict = {
+        "bold": True,
+        "border": 1,
+        "align": "center",
+        "valign": "top",
+    }
+
+    def __init__(self, file_path: str) -> NoReturn:
+        self.file_path = file_path
+        self.__workbook = xlsxwriter.Workbook(
+            file_path,
+            {
+                "constant_memory": True,
+                "strings_to_urls": False,
+                "nan_inf_to_errors": True,
+                "default_date_format": "yyyy-mm-dd hh:mm:ss",
+            },
+        )
+        self.__header_format = self.__workbook.add_format(self._header_format_dict)
+
+    def write_dataframes(
+        self,
+        df_iterable: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        sheet_name: str,
+        write_index: bool = False,
+    ) -> List[str]:
+        """
+        :param df_iterable: dataframe, or iterable of dataframe chunks with the same
+            columns, e.g. from PsqlConnector.iter_query_results
+        :return: names of the written sheets; empty if there were no rows
+        """
+        if isinstance(df_iterable, pd.DataFrame):
+            df_iterable = PandasOps.iter_row_chunks(
+                df_iterable, chunk_size=self._default_chunk_size
+            )
+
+        sheet_name_list = []
+        worksheet = None
+        row_number = self._max_sheet_row_count
+        for df in df_iterable:
+            if PandasOps.get_row_count(df) == 0:
+                continue
+
+            index_value_list_list, value_list_list = self._get_row_values(
+                df, write_index=write_index
+            )
+            for index_value_list, value_list in zip(
+                index_value_list_list, value_list_list
+            ):
+                if row_number >= self._max_sheet_row_count:
+                    sheet_name_list.append(
+                        self._get_sheet_name(sheet_name, len(sheet_name_list) + 1)
+                    )
+                    worksheet = self.__workbook.add_worksheet(sheet_name_list[-1])
+                    worksheet.write_row(
+                        0, 0, self._get_header(df, write_index), self.__header_format
+                    )
+                    row_number = 1
+                worksheet.write_row(
+                    row_number, 0, index_value_list, self.__header_format
+                )
+                try:
+                    worksheet.write_row(row_number, len(index_value_list), value_list)
+                except TypeError:
+                    # e.g. timezone-aware datetimes or objects xlsxwriter cannot write
+                    worksheet.write_row(
+                        row_number,
+                        len(index_value_list),
+                        [self._get_writable_value(value) for value in value_list],
+                    )
+                row_number += 1
+        return sheet_name_list
+
+    def close(self) -> NoReturn:
+        self.__workbook.close()
+
+    def __enter__(self) -> "XlsxStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> NoReturn:
+        self.close()
+
+    @classmethod
+    def _get_sheet_name(cls, sheet_name: str, sheet_number: int) -> str:
+        if sheet_number == 1:
+            return sheet_name
+        suffix = f"_{sheet_number}"
+        return f"{sheet_name[: cls._max_sheet_name_length - len(suffix)]}{suffix}"
+
+    @classmethod
+    def _get_header(cls, df: pd.DataFrame, write_index: bool) -> List[str]:
+        header = [str(column_name) for column_name in df.columns]
+        if write_index:
+            index_name_list = [
+                "" if index_name is None else str(index_name)
+                for index_name in df.index.names
+            ]
+            header = index_name_list + header
+        return header
+
+    @classmethod
+    def _get_writable_value(cls, value):
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, (datetime.date, datetime.time, datetime.timedelta)):
+            return value if getattr(value, "tzinfo", None) is None else str(value)
+        try:
+            float(value)
+            return value
+        except (TypeError, ValueError):
+            return str(value)
+
+    @classmethod
+    def _get_row_values(cls, df: pd.DataFrame, write_index: bool) -> tuple:
+        """
+        Convert a chunk into lists of python values per row, with None for missing
+        values, which xlsxwriter leaves as empty cells.
+        """
+        df = df.astype(object).where(df.notna(), None)
+        value_list_list = df.to_numpy().tolist()
+        if not write_index:
+            return [[]] * len(value_list_list), value_list_list
+
+        df_index = df.index.to_frame(index=False).astype(object)
+        df_index = df_index.where(df_index.notna(), None)
+        return df_index.to_numpy().tolist(), value_list_list
@@ -0,0 +1,32 @@
+import os.path
+import sys
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from GiantPandas.ConcurrentOps import ConcurrentOps
+
+
+def test_001_iter_ordered_map():
+    assert list(
+        ConcurrentOps.iter_ordered_map(lambda x: 2 * x, range(10), max_workers=3)
+    ) == [2 * x for x in range(10)]
+
+
+def test_002_iter_ordered_map_bounded_read_ahead():
+    started_list = []
+    lock = threading.Lock()
+
+    def _record(x: int) -> int:
+        with lock:
+            started_list.append(x)
+        return x
+
+    result_iterator = ConcurrentOps.iter_ordered_map(
+        _record, range(100), max_workers=2
+    )
+    assert next(result_iterator) == 0
+    # the first result is yielded once 2 * max_workers calls are submitted
+    assert len(started_list) <= 4
+    result_iterator.close()
+    assert len(started_list) <= 4
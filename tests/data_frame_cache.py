@@ -0,0 +1,94 @@
+import os.path
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import pandas as pd
+
+from GiantPandas.DataFrameCache import DataFrameCache
+
+test_df = pd.DataFrame(
+    {
+        "id": pd.array([1, None], dtype="Int64"),
+        "name": ["a", None],
+        "updated_date": pd.to_datetime(["2000-01-01", None]),
+    }
+)
+
+
+def test_001_set_and_get():
+    cache = DataFrameCache(tempfile.mkdtemp())
+    assert cache.get("key") is None
+    assert cache.set("key", test_df, tag_list=["table"])
+    pd.testing.assert_frame_equal(cache.get("key"), test_df)
+    assert cache.set("unsupported", pd.DataFrame({0: [1]})) is False
+
+
+def test_002_expire_and_invalidate():
+    cache_dir = tempfile.mkdtemp()
+    cache = DataFrameCache(cache_dir)
+    cache.set("expired", test_df, ttl=-1)
+    cache.set("tagged", test_df, tag_list=["table"])
+    cache.set("current", test_df, tag_list=["table", "version"])
+    cache.set("other", test_df)
+    assert cache.get("expired") is None
+    assert DataFrameCache(cache_dir).get("tagged") is not None
+    assert cache.invalidate_tag("table", except_tag="version") == 1
+    assert cache.get("current") is not None
+    assert cache.invalidate_tag("table") == 1
+    assert cache.get("tagged") is None
+    assert cache.get("other") is not None
+
+
+def test_003_evict_least_recently_used():
+    cache = DataFrameCache(tempfile.mkdtemp())
+    cache.set("first", test_df)
+    entry_size = cache.get_size()
+    cache.max_size_bytes = 2 * entry_size
+    cache.set("second", test_df)
+    cache.get("first")
+    cache.set("third", test_df)
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.get("third") is not None
+
+
+def test_004_share_directory_between_instances():
+    cache_dir = tempfile.mkdtemp()
+    first_cache = DataFrameCache(cache_dir)
+    second_cache = DataFrameCache(cache_dir)
+    first_cache.set("first", test_df)
+    second_cache.set("second", test_df)
+    # entries of one instance are neither lost nor hidden by the other
+    assert second_cache.get("first") is not None
+    assert first_cache.get("second") is not None
+    entry_size = first_cache.get_size() // 2
+    assert DataFrameCache(cache_dir).get_size() == 2 * entry_size
+    first_cache.invalidate("second")
+    assert second_cache.get("second") is None
+
+    # the access time of get is saved, so eviction is least recently used overall
+    third_cache = DataFrameCache(cache_dir, max_size_bytes=2 * entry_size)
+    third_cache.set("second", test_df)
+    second_cache.get("first")
+    third_cache.set("third", test_df)
+    assert first_cache.get("second") is None
+    assert first_cache.get("first") is not None
+    assert first_cache.get("third") is not None
+
+
+def test_005_get_without_saving_index():
+    cache_dir = tempfile.mkdtemp()
+    cache = DataFrameCache(cache_dir)
+    cache.set("key", test_df)
+    index_file_path = os.path.join(cache_dir, "index.json")
+    entry_file_path = os.path.join(
+        cache_dir, f"{DataFrameCache._get_entry_id('key')}.feather"
+    )
+    os.utime(index_file_path, ns=(0, 0))
+    os.utime(entry_file_path, ns=(0, 0))
+    # a hit only touches the file of the entry, which marks its last access
+    assert DataFrameCache(cache_dir).get("key") is not None
+    assert os.stat(index_file_path).st_mtime_ns == 0
+    assert os.stat(entry_file_path).st_mtime_ns > 0
@@ -1,9 +1,15 @@
 import os.path
 import sys
+import shutil
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
+import pandas as pd
+
+from GiantPandas.PandasOps import PandasOps
 from GiantPandas.ExcelConnector import ExcelConnector
+from GiantPandas.DataFrameCache import DataFrameCache
+from GiantPandas.XlsxStreamWriter import XlsxStreamWriter
 
 test_excel_folder = "tests"
 test_excel_filename = "table_to_psql.xlsx"
@@ -12,3 +18,128 @@ test_excel_file = os.path.join(test_excel_folder, test_excel_filename)
 
 def test_001_get_sheet_names():
     assert ExcelConnector.get_sheet_names(test_excel_file) == ["sheet_1", "sheet_2"]
+
+
+def test_002_iter_dataframe_from_excel():
+    df = pd.read_excel(test_excel_file)
+    df_chunk_list = list(
+        ExcelConnector.iter_dataframe_from_excel(test_excel_file, chunksize=4)
+    )
+    assert [len(df_chunk.index) for df_chunk in df_chunk_list] == [4, 4, 2]
+    # integers of the first chunk, including those of " # int with nan #", are Int64
+    column_dtype_dict = {
+        column_name: "Int64"
+        for column_name in df.select_dtypes(include="int64").columns
+    }
+    column_dtype_dict[df.columns[4]] = "Int64"
+    pd.testing.assert_frame_equal(
+        pd.concat(df_chunk_list, ignore_index=True), df.astype(column_dtype_dict)
+    )
+
+    df_chunk = next(
+        ExcelConnector.iter_dataframe_from_excel(
+            test_excel_file, usecols=["id", 2], dtype={"id": "float64"}
+        )
+    )
+    assert df_chunk.columns.tolist() == ["id", "all_int"]
+    assert df_chunk["id"].dtype == "float64"
+    assert (
+        list(ExcelConnector.iter_dataframe_from_excel(test_excel_file, "sheet_2")) == []
+    )
+
+
+def test_003_get_sheet_dimensions():
+    assert ExcelConnector.get_sheet_dimensions(test_excel_file) == {
+        "sheet_1": (11, 11),
+        "sheet_2": (1, 1),
+    }
+
+
+def test_004_get_dataframes_from_excel():
+    df_dict = pd.read_excel(test_excel_file, sheet_name=None)
+    for max_workers in [1, 2]:
+        sheet_name_to_df_dict = ExcelConnector.get_dataframes_from_excel(
+            test_excel_file, max_workers=max_workers
+        )
+        assert list(sheet_name_to_df_dict.keys()) == ["sheet_1", "sheet_2"]
+        pd.testing.assert_frame_equal(
+            sheet_name_to_df_dict["sheet_1"], df_dict["sheet_1"]
+        )
+        assert sheet_name_to_df_dict["sheet_2"].empty
+
+    sheet_name_to_df_dict = ExcelConnector.get_dataframes_from_excel(
+        test_excel_file, sheet_names=[0]
+    )
+    pd.testing.assert_frame_equal(sheet_name_to_df_dict[0], df_dict["sheet_1"])
+
+
+def test_005_send_dataframe_to_excel_streaming(tmp_path):
+    df = pd.read_excel(test_excel_file)
+    file_path = os.path.join(str(tmp_path), "streamed.xlsx")
+    ExcelConnector.send_dataframe_to_excel(
+        file_path,
+        [(PandasOps.iter_row_chunks(df, chunk_size=3), "sheet_1"), (df.iloc[:0], "x")],
+        streaming=True,
+    )
+    assert ExcelConnector.get_sheet_names(file_path) == ["sheet_1"]
+    pd.testing.assert_frame_equal(pd.read_excel(file_path), df)
+
+
+def test_006_xlsx_stream_writer_sheet_rollover(tmp_path, monkeypatch):
+    monkeypatch.setattr(XlsxStreamWriter, "_max_sheet_row_count", 5)
+    df = pd.DataFrame({"id": range(10)})
+    file_path = os.path.join(str(tmp_path), "rollover.xlsx")
+    with XlsxStreamWriter(file_path) as writer:
+        sheet_name_list = writer.write_dataframes(
+            PandasOps.iter_row_chunks(df, chunk_size=3), sheet_name="sheet"
+        )
+    assert sheet_name_list == ["sheet", "sheet_2", "sheet_3"]
+    df_dict = pd.read_excel(file_path, sheet_name=None)
+    assert [len(df_dict[sheet_name].index) for sheet_name in sheet_name_list] == [
+        4,
+        4,
+        2,
+    ]
+    pd.testing.assert_frame_equal(
+        pd.concat(list(df_dict.values()), ignore_index=True), df
+    )
+
+
+def test_007_get_dataframe_from_excel_with_cache(tmp_path):
+    cache = DataFrameCache(os.path.join(str(tmp_path), "cache"))
+    file_path = os.path.join(str(tmp_path), "cached.xlsx")
+    shutil.copyfile(test_excel_file, file_path)
+
+    df = ExcelConnector.get_dataframe_from_excel(file_path, cache=cache)
+    pd.testing.assert_frame_equal(df, pd.read_excel(test_excel_file))
+    cache_size = cache.get_size()
+    assert cache_size > 0
+    pd.testing.assert_frame_equal(
+        ExcelConnector.get_dataframe_from_excel(file_path, cache=cache), df
+    )
+
+    ExcelConnector.send_dataframe_to_excel(
+        file_path, [(df.iloc[:2], "sheet_1")], streaming=True
+    )
+    pd.testing.assert_frame_equal(
+        ExcelConnector.get_dataframe_from_excel(file_path, cache=cache),
+        pd.read_excel(file_path),
+    )
+    assert cache.get_size() < cache_size
+    assert ExcelConnector.invalidate_excel_cache(cache, file_path) == 1
+    assert cache.get_size() == 0
+
+
+def test_008_iter_dataframe_from_excel_dtypes(tmp_path):
+    file_path = os.path.join(str(tmp_path), "dtypes.xlsx")
+    df = pd.DataFrame({"a": [1, 2, 3, None], "b": [None, None, "x", "y"]})
+    ExcelConnector.send_dataframe_to_excel(file_path, [(df, "sheet_1")])
+    df_chunk_list = list(
+        ExcelConnector.iter_dataframe_from_excel(file_path, chunksize=2)
+    )
+    # dtypes of the first chunk hold the missing and text values of the second
+    for df_chunk in df_chunk_list:
+        assert df_chunk.dtypes.tolist() == ["Int64", "object"]
+    df_result = pd.concat(df_chunk_list, ignore_index=True)
+    assert df_result["a"].tolist()[:3] == [1, 2, 3] and pd.isna(df_result.at[3, "a"])
+    assert df_result["b"].tolist()[2:] == ["x", "y"]
@@ -3,6 +3,8 @@ import sys
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
+import itertools
+
 import pandas as pd
 
 from GiantPandas.PandasOps import PandasOps
@@ -138,3 +140,94 @@ def test_013_get_maximum_length_of_dtype_object_values():
     assert (
         PandasOps.get_maximum_length_of_dtype_object_values(test_df, "all strings") == 4
     )
+
+
+def test_014_iter_row_chunks():
+    chunk_list = list(PandasOps.iter_row_chunks(test_df, chunk_size=4))
+    assert [PandasOps.get_row_count(df) for df in chunk_list] == [4, 4, 2] and pd.concat(
+        chunk_list
+    ).equals(test_df)
+
+
+def test_015_profile_columns():
+    profile_df = PandasOps.profile_columns(
+        test_df,
+        column_name_list=["id", "all strings", "float with nans", " # int with nan # "],
+    )
+    assert (
+        profile_df["dtype"].tolist() == ["int64", "object", "float64", "float64"]
+        and profile_df["null_count"].tolist() == [0, 0, 1, 1]
+        and profile_df["is_integer"].tolist() == [True, False, False, True]
+        and profile_df.at["all strings", "max_byte_length"] == 4
+        and profile_df.at[" # int with nan # ", "max"] == 10
+    )
+
+
+def test_016_optimize_memory():
+    df = pd.DataFrame(
+        {
+            "small_int": [1, 2, 3, 4],
+            "big_int": [0, 2 ** 40, 1, 2],
+            "exact_float": [0.5, 1.25, None, 2.0],
+            "inexact_float": [0.1, 0.2, 0.3, 0.4],
+            "repeated_string": ["a", "a", "b", "a"],
+            "unique_string": ["a", "b", "c", "d"],
+            "mixed": [1, "a", 2, "b"],
+        }
+    )
+    optimized_df, report_df = PandasOps.optimize_memory(df)
+    assert report_df["dtype_after"].tolist() == [
+        "int8",
+        "int64",
+        "float32",
+        "float64",
+        "category",
+        "object",
+        "object",
+    ]
+    assert (report_df["bytes_after"] <= report_df["bytes_before"]).all()
+    pd.testing.assert_frame_equal(
+        optimized_df.astype(object).where(optimized_df.notna(), None),
+        df.astype(object).where(df.notna(), None),
+    )
+
+
+def test_017_get_dataframe_with_all_permutations_from_dict():
+    dict_with_list_values = {"id": [1, 2, 3], "name": ["a", "b"], "value": [0.5, None]}
+    df = PandasOps.get_dataframe_with_all_permutations_from_dict(dict_with_list_values)
+    pd.testing.assert_frame_equal(
+        df,
+        pd.DataFrame(
+            list(itertools.product(*dict_with_list_values.values())),
+            columns=dict_with_list_values.keys(),
+        ),
+    )
+    assert df.dtypes.tolist() == ["int64", "object", "float64"]
+
+    df_chunk_list = list(
+        PandasOps.iter_dataframe_with_all_permutations_from_dict(
+            dict_with_list_values, chunk_size=5
+        )
+    )
+    assert [PandasOps.get_row_count(df_chunk) for df_chunk in df_chunk_list] == [
+        5,
+        5,
+        2,
+    ]
+    pd.testing.assert_frame_equal(pd.concat(df_chunk_list), df)
+    empty_df = PandasOps.get_dataframe_with_all_permutations_from_dict(
+        {"id": [1], "name": []}
+    )
+    assert PandasOps.get_row_count(empty_df) == 0
+
+
+def test_018_profile_nullable_float_columns():
+    df = pd.DataFrame(
+        {
+            "whole": pd.array([1.0, None], dtype="Float32"),
+            "fraction": pd.array([0.5, None], dtype="Float64"),
+        }
+    )
+    profile_df = PandasOps.profile_columns(df)
+    assert profile_df["null_count"].tolist() == [1, 1]
+    assert profile_df["is_integer"].tolist() == [True, False]
@@ -0,0 +1,82 @@
+import os.path
+import sys
+import struct
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pandas as pd
+
+from GiantPandas.PgCopyOps import PgCopyOps
+
+test_df = pd.DataFrame(
+    {
+        "id": pd.array([1, None], dtype="Int64"),
+        "value": [0.5, np.nan],
+        "name": ["ä", None],
+        "updated_date": pd.to_datetime(["2000-01-01 00:00:01", None]),
+        "flag": [True, False],
+    }
+)
+test_column_name_type_dict = {
+    "id": "bigint",
+    "value": "double precision",
+    "name": "character varying(3)",
+    "updated_date": "timestamp",
+    "flag": "boolean",
+}
+
+
+def test_001_get_binary_header_and_trailer():
+    assert PgCopyOps.get_binary_header() == b"PGCOPY\n\xff\r\n\x00" + bytes(8) and (
+        PgCopyOps.get_binary_trailer() == b"\xff\xff"
+    )
+
+
+def test_002_encode_dataframe_to_binary():
+    first_row = (
+        struct.pack(">h", 5)
+        + struct.pack(">iq", 8, 1)
+        + struct.pack(">id", 8, 0.5)
+        + struct.pack(">i", 2)
+        + "ä".encode("utf-8")
+        + struct.pack(">iq", 8, 1000000)
+        + struct.pack(">i?", 1, True)
+    )
+    second_row = (
+        struct.pack(">h", 5)
+        + struct.pack(">iiii", -1, -1, -1, -1)
+        + struct.pack(">i?", 1, False)
+    )
+    assert (
+        PgCopyOps.encode_dataframe_to_binary(test_df, test_column_name_type_dict)
+        == first_row + second_row
+    )
+
+
+def test_003_encode_dataframe_with_null_columns_to_binary():
+    # every value of a fixed width column can be null within a chunk
+    df = pd.DataFrame({"id": [1, 2], "value": [np.nan, np.nan]})
+    assert PgCopyOps.encode_dataframe_to_binary(
+        df, {"id": "bigint", "value": "double precision"}
+    ) == b"".join(
+        struct.pack(">h", 2) + struct.pack(">iq", 8, id) + struct.pack(">i", -1)
+        for id in [1, 2]
+    )
+    second_row = struct.pack(">h", 5) + struct.pack(">iiiii", -1, -1, -1, -1, -1)
+    df = test_df.iloc[1:].copy()
+    df["flag"] = None
+    assert (
+        PgCopyOps.encode_dataframe_to_binary(df, test_column_name_type_dict)
+        == second_row
+    )
+
+
+def test_004_get_binary_compatible_data_types():
+    assert PgCopyOps.get_binary_compatible_data_types("timestamp") == [
+        "timestamp without time zone"
+    ]
+    assert PgCopyOps.get_binary_compatible_data_types("character varying(3)") == [
+        "character varying",
+        "text",
+    ]
@@ -0,0 +1,420 @@
+import io
+import time
+import asyncio
+import os.path
+import sys
+import uuid
+import threading
+import collections
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pandas as pd
+import psycopg2
+import pytest
+
+from GiantPandas.PsqlConnector import PsqlConnector
+from GiantPandas.exceptions import InvalidValue
+
+# connection of the test database, taken from the libpq environment variables
+test_connection_kwargs = dict(
+    host=os.environ.get("PGHOST", "localhost"),
+    dbname=os.environ.get("PGDATABASE", "postgres"),
+    username=os.environ.get("PGUSER", "postgres"),
+    password=os.environ.get("PGPASSWORD", ""),
+    port=os.environ.get("PGPORT", "5432"),
+)
+test_schema_name = "public"
+offline_psql_connector = PsqlConnector(**test_connection_kwargs)
+description_column = collections.namedtuple("description_column", "name type_code")
+test_df = pd.DataFrame(
+    {
+        "id": np.arange(3),
+        "name": ["a", None, "c"],
+        "value": [0.5, None, 1.5],
+    }
+)
+
+
+@pytest.fixture
+def psql_connector():
+    connector = PsqlConnector(**test_connection_kwargs)
+    try:
+        connector.get_query_results("SELECT 1;", use_cache=False)
+    except psycopg2.OperationalError:
+        pytest.skip("no postgres database is reachable")
+    yield connector
+    connector.close()
+
+
+@pytest.fixture
+def table_name(psql_connector):
+    table_name = f"giant_pandas_test_{uuid.uuid4().hex[:12]}"
+    yield table_name
+    psql_connector._drop_table(schema_name=test_schema_name, table_name=table_name)
+
+
+def get_table(psql_connector: PsqlConnector, table_name: str) -> pd.DataFrame:
+    return psql_connector.get_query_results(
+        f'SELECT * FROM {test_schema_name}."{table_name}" ORDER BY id;',
+        use_cache=False,
+    )
+
+
+def test_001_upload_dataframe_replace_and_append(psql_connector, table_name):
+    for format in ["text", "csv", "binary"]:
+        psql_connector.upload_dataframe(
+            test_df, test_schema_name, table_name, if_exists="replace", format=format
+        )
+        psql_connector.upload_dataframe(
+            test_df, test_schema_name, table_name, if_exists="append", format=format
+        )
+        df = get_table(psql_connector, table_name)
+        assert len(df.index) == 2 * len(test_df.index)
+        assert df["id"].tolist() == [0, 0, 1, 1, 2, 2]
+        assert df["name"].isna().sum() == 2
+
+
+def get_staging_table_names(psql_connector: PsqlConnector, table_name: str) -> list:
+    return psql_connector.get_query_results(
+        f"""
+        SELECT table_name
+        FROM   information_schema.tables
+        WHERE  table_name LIKE '{table_name}%staging%';""",
+        use_cache=False,
+    )["table_name"].tolist()
+
+
+def test_002_upload_dataframe_upsert(psql_connector, table_name):
+    psql_connector.upload_dataframe(test_df, test_schema_name, table_name)
+    df_update = pd.DataFrame({"id": [2, 3], "name": ["z", "d"], "value": [2.5, 3.5]})
+    psql_connector.upload_dataframe(
+        df_update,
+        test_schema_name,
+        table_name,
+        if_exists="upsert",
+        key_column_list=["id"],
+    )
+    df = get_table(psql_connector, table_name)
+    assert df["id"].tolist() == [0, 1, 2, 3]
+    assert df["name"].tolist() == ["a", None, "z", "d"]
+    assert get_staging_table_names(psql_connector, table_name) == []
+
+
+def test_003_upload_dataframe_in_parallel(psql_connector, table_name):
+    for if_exists in ["replace", "append"]:
+        psql_connector.upload_dataframe(
+            test_df, test_schema_name, table_name, if_exists=if_exists, parallel=2
+        )
+    assert get_table(psql_connector, table_name)["id"].tolist() == [0, 0, 1, 1, 2, 2]
+    assert get_staging_table_names(psql_connector, table_name) == []
+
+
+def test_004_iter_quoted_csv_chunks():
+    df = pd.DataFrame({"id": [1, 2, 3], "name": ['a,"b"', "", None]})
+    csv_contents = b"".join(
+        offline_psql_connector._iter_quoted_csv_chunks(df, chunk_size=2)
+    )
+    assert csv_contents == b'1,"a,""b"""\n2,""\n3,\n'
+
+
+def test_005_read_csv_query_results():
+    description = [
+        description_column("id", 20),
+        description_column("name", 25),
+        description_column("value", 701),
+        description_column("is_valid", 16),
+        description_column("updated_at", 1114),
+    ]
+    csv_file = io.BytesIO(
+        b"9007199254740993,a,0.5,t,946684800000000\n" b"#N/A,#N/A,#N/A,#N/A,#N/A\n"
+    )
+    df = offline_psql_connector._read_csv_query_results(csv_file, description)
+    assert df.columns.tolist() == ["id", "name", "value", "is_valid", "updated_at"]
+    assert df["id"].dtype == "Int64" and df.at[0, "id"] == 2 ** 53 + 1
+    assert df["id"].isna().tolist() == [False, True]
+    assert df["name"].isna().tolist() == [False, True]
+    assert df["is_valid"].dtype == "boolean"
+    assert df.at[0, "updated_at"] == pd.Timestamp("2000-01-01")
+    assert pd.isna(df.at[1, "updated_at"])
+
+
+def test_006_get_delta_from_existing_row_hashes():
+    row_hash_column_name = offline_psql_connector._row_hash_column_name
+    df = pd.DataFrame(
+        {"id": [1, 2, 3], row_hash_column_name: [2 ** 62, 2 ** 62 + 1, 5]}
+    )
+    df_existing = pd.DataFrame(
+        {
+            "id": [1, 2, 4],
+            row_hash_column_name: pd.array([2 ** 62, 2 ** 62, None], dtype="Int64"),
+        }
+    )
+    df_changed, df_deleted_key = (
+        offline_psql_connector._get_delta_from_existing_row_hashes(
+            df, df_existing, key_column_list=["id"]
+        )
+    )
+    # hashes differing in the lowest bit only are changed rows
+    assert df_changed["id"].tolist() == [2, 3]
+    assert df_deleted_key["id"].tolist() == [4]
+
+
+def test_007_get_dict_of_column_name_to_type_from_csv_sample():
+    csv_contents = "\ufeffID;Name;Value;Empty\n1;a;0.5;NULL\n2;NULL;1.5;NULL\n".encode(
+        "utf-8"
+    )
+    assert offline_psql_connector._get_dict_of_column_name_to_type_from_csv_sample(
+        csv_contents, csv_sep=";", csv_null_identifier="NULL"
+    ) == {
+        "id": "bigint",
+        "name": "text",
+        "value": "double precision",
+        "empty": "text",
+    }
+
+
+def test_008_upload_dataframe_delta(psql_connector, table_name):
+    upload_kwargs = dict(if_exists="delta", key_column_list=["id"])
+    psql_connector.upload_dataframe(
+        test_df, test_schema_name, table_name, **upload_kwargs
+    )
+    df_update = test_df.iloc[1:].copy()
+    df_update.loc[2, "name"] = "z"
+    psql_connector.upload_dataframe(
+        df_update, test_schema_name, table_name, **upload_kwargs
+    )
+    df = get_table(psql_connector, table_name)
+    assert df["id"].tolist() == [1, 2]
+    assert df["name"].tolist() == [None, "z"]
+
+
+def test_009_get_query_results_with_copy(psql_connector, table_name):
+    psql_connector.upload_dataframe(test_df, test_schema_name, table_name)
+    query = f'SELECT * FROM {test_schema_name}."{table_name}" ORDER BY id;'
+    df = psql_connector.get_query_results(query, use_copy=True, use_cache=False)
+    assert df["id"].dtype == "Int64"
+    assert df["id"].tolist() == [0, 1, 2]
+    assert df["name"].isna().tolist() == [False, True, False]
+    assert df["value"].isna().tolist() == [False, True, False]
+
+    df_chunk_list = list(psql_connector.iter_query_results(query, chunk_size=2))
+    assert [len(df_chunk.index) for df_chunk in df_chunk_list] == [2, 1]
+    assert pd.concat(df_chunk_list, ignore_index=True)["id"].tolist() == [0, 1, 2]
+
+
+def test_010_get_many_query_results_with_pool():
+    with PsqlConnector(
+        **test_connection_kwargs, use_pool=True, pool_max_size=2
+    ) as psql_connector:
+        try:
+            psql_connector.get_query_results("SELECT 1;")
+        except psycopg2.OperationalError:
+            pytest.skip("no postgres database is reachable")
+        result_list = psql_connector.get_many_query_results(
+            [f"SELECT {i} AS i;" for i in range(5)] + ["SELECT * FROM missing_table;"]
+        )
+    assert [df.at[0, "i"] for df in result_list[:5]] == list(range(5))
+    assert isinstance(result_list[5], Exception)
+
+
+def test_011_get_many_query_results_without_pool():
+    psql_connector = PsqlConnector(**test_connection_kwargs, pool_max_size=2)
+    try:
+        psql_connector.get_query_results("SELECT 1;", use_cache=False)
+    except psycopg2.OperationalError:
+        pytest.skip("no postgres database is reachable")
+
+    get_connection = psql_connector._get_connection
+    release_connection = psql_connector._release_connection
+    lock = threading.Lock()
+    connection_count_dict = {"open": 0, "max_open": 0}
+
+    def _get_connection():
+        conn = get_connection()
+        with lock:
+            connection_count_dict["open"] += 1
+            connection_count_dict["max_open"] = max(
+                connection_count_dict["max_open"], connection_count_dict["open"]
+            )
+        return conn
+
+    def _release_connection(conn):
+        with lock:
+            connection_count_dict["open"] -= 1
+        release_connection(conn)
+
+    psql_connector._get_connection = _get_connection
+    psql_connector._release_connection = _release_connection
+    query_list = [f"SELECT {i} AS i, pg_sleep(0.05);" for i in range(8)]
+    assert psql_connector._get_query_worker_count(query_list, max_workers=None) == 2
+    # more workers than connections still open at most pool_max_size connections
+    result_list = psql_connector.get_many_query_results(query_list, max_workers=8)
+    assert [df.at[0, "i"] for df in result_list] == list(range(8))
+    assert connection_count_dict["max_open"] == 2
+
+
+def test_012_read_csv_records():
+    csv_contents = b'id,name\n1,"a\n\nb"\n2,"c"""\n3,d\n'
+    line_stream = io.BufferedReader(io.BytesIO(csv_contents))
+    # the quoted line breaks of the first row do not end the sample
+    head_contents = offline_psql_connector._read_csv_records(line_stream, 2)
+    assert head_contents == b'id,name\n1,"a\n\nb"\n'
+    assert offline_psql_connector._read_csv_records(line_stream, 5) == (
+        b'2,"c"""\n3,d\n'
+    )
+
+
+def test_013_upload_csv_from_s3_with_quoted_line_breaks(psql_connector, table_name):
+    moto = pytest.importorskip("moto")
+    boto3 = pytest.importorskip("boto3")
+    from GiantPandas import S3Connector
+
+    csv_contents = b'id;name\n1;"a\nb"\n2;NULL\n'
+    with moto.mock_aws():
+        s3_connector = S3Connector(aws_region="eu-central-1")
+        s3_client = boto3.client("s3", region_name="eu-central-1")
+        s3_client.create_bucket(
+            Bucket="giant-pandas-test",
+            CreateBucketConfiguration={"LocationConstraint": "eu-central-1"},
+        )
+        s3_client.put_object(
+            Bucket="giant-pandas-test", Key="quoted.csv", Body=csv_contents
+        )
+        row_count = psql_connector.upload_csv_from_s3(
+            s3_connector,
+            bucket="giant-pandas-test",
+            object_key="quoted.csv",
+            schema_name=test_schema_name,
+            table_name=table_name,
+            csv_sep=";",
+            csv_null_identifier="NULL",
+            sample_size=1,
+        )
+    assert row_count == 2
+    df = get_table(psql_connector, table_name)
+    assert df["name"].tolist() == ["a\nb", None]
+
+
+def test_014_upload_dataframe_with_nullable_floats(psql_connector, table_name):
+    df = pd.DataFrame(
+        {
+            "id": pd.array([0, 1, 2], dtype="Int8"),
+            "value": pd.array([0.5, None, 1.5], dtype="Float32"),
+            "whole_value": pd.array([1.0, None, 2.0], dtype="Float64"),
+        }
+    )
+    psql_connector.upload_dataframe(df, test_schema_name, table_name)
+    df_result = get_table(psql_connector, table_name)
+    assert df_result["value"].isna().tolist() == [False, True, False]
+    assert df_result.at[2, "value"] == 1.5
+    assert df_result.at[2, "whole_value"] == 2
+
+
+def test_015_upload_fractions_into_integer_column(psql_connector, table_name):
+    psql_connector.upload_dataframe(
+        pd.DataFrame({"id": [0, 1], "value": [1.0, 2.0]}), test_schema_name, table_name
+    )
+    df_fraction = pd.DataFrame({"id": [1], "value": [1.5]})
+    # staged rows are not rounded into the bigint column, as in a direct append
+    for upload_kwargs in [
+        dict(if_exists="upsert", key_column_list=["id"]),
+        dict(if_exists="delta", key_column_list=["id"]),
+        dict(if_exists="append", parallel=2),
+    ]:
+        with pytest.raises(InvalidValue):
+            psql_connector.upload_dataframe(
+                df_fraction, test_schema_name, table_name, **upload_kwargs
+            )
+    with pytest.raises(psycopg2.DataError):
+        psql_connector.upload_dataframe(
+            df_fraction, test_schema_name, table_name, if_exists="append"
+        )
+    assert get_table(psql_connector, table_name)["value"].tolist() == [1, 2]
+    assert get_staging_table_names(psql_connector, table_name) == []
+
+
+def test_016_upload_dataframe_binary_with_null_columns(psql_connector, table_name):
+    df = pd.DataFrame({"id": [1, 2], "value": [np.nan, np.nan]})
+    psql_connector.upload_dataframe(df, test_schema_name, table_name, format="binary")
+    psql_connector.upload_dataframe(
+        test_df, test_schema_name, table_name + "_2", format="binary", chunk_size=1
+    )
+    df_result = get_table(psql_connector, table_name + "_2")
+    psql_connector._drop_table(test_schema_name, table_name + "_2")
+    assert df_result["name"].tolist() == ["a", None, "c"]
+    assert get_table(psql_connector, table_name)["value"].isna().all()
+
+    # the bigint column cannot read double precision values in binary format
+    with pytest.raises(InvalidValue):
+        psql_connector.upload_dataframe(
+            pd.DataFrame({"id": [3], "value": [0.5]}),
+            test_schema_name,
+            table_name,
+            if_exists="append",
+            format="binary",
+        )
+
+
+def test_017_upload_excel_chunks(psql_connector, table_name, tmp_path):
+    from GiantPandas.ExcelConnector import ExcelConnector
+
+    file_path = os.path.join(str(tmp_path), "flags.xlsx")
+    df = pd.DataFrame({"id": [0, 1, 2], "flag": [True, False, None]})
+    ExcelConnector.send_dataframe_to_excel(file_path, [(df, "sheet_1")])
+    for format in ["text", "csv", "binary"]:
+        for if_exists, df_chunk in zip(
+            ["replace", "append"],
+            ExcelConnector.iter_dataframe_from_excel(file_path, chunksize=2),
+        ):
+            assert df_chunk["flag"].dtype == "boolean"
+            psql_connector.upload_dataframe(
+                df_chunk, test_schema_name, table_name, if_exists, format=format
+            )
+        df_result = get_table(psql_connector, table_name)
+        assert df_result["flag"].tolist()[:2] == [True, False]
+        assert df_result["flag"].isna().tolist() == [False, False, True]
+
+
+def test_018_upload_boolean_query_results(psql_connector, table_name):
+    df = pd.DataFrame(
+        {"id": [0, 1, 2], "flag": pd.array([True, False, None], dtype="boolean")}
+    )
+    psql_connector.upload_dataframe(df, test_schema_name, table_name)
+    query = f'SELECT * FROM {test_schema_name}."{table_name}" ORDER BY id;'
+    # results with boolean columns go back into a table unchanged
+    for df_result in [
+        psql_connector.get_query_results(query, use_copy=True, use_cache=False),
+        next(psql_connector.iter_query_results(query)),
+    ]:
+        assert df_result["flag"].dtype == "boolean"
+        psql_connector.upload_dataframe(df_result, test_schema_name, table_name)
+        df_uploaded = get_table(psql_connector, table_name)
+        assert df_uploaded["flag"].tolist()[:2] == [True, False]
+        assert pd.isna(df_uploaded.at[2, "flag"])
+
+
+def test_019_get_query_results_with_copy_ending_in_comment(psql_connector):
+    df = psql_connector.get_query_results(
+        "SELECT 1 AS a -- comment", use_copy=True, use_cache=False
+    )
+    assert df["a"].tolist() == [1]
+
+
+def test_020_cancel_get_many_query_results_async(psql_connector):
+    async def _cancel_queries() -> float:
+        task = asyncio.ensure_future(
+            psql_connector.get_many_query_results_async(
+                ["SELECT pg_sleep(0.5);"] * 4, max_workers=1
+            )
+        )
+        await asyncio.sleep(0.1)
+        start_time = time.monotonic()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return time.monotonic() - start_time
+
+    # the loop neither waits for the running query nor runs the queued ones
+    assert asyncio.run(_cancel_queries()) < 0.3
@@ -0,0 +1,173 @@
+import io
+import os.path
+import sys
+import gzip
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import boto3
+import numpy as np
+import pandas as pd
+import pytest
+
+moto = pytest.importorskip("moto")
+
+from GiantPandas import S3Connector
+from GiantPandas.S3MultipartWriter import S3MultipartWriter
+from GiantPandas.S3RangeReader import S3RangeReader
+
+test_bucket = "giant-pandas-test"
+test_df = pd.DataFrame(
+    {
+        "id": np.arange(6),
+        "name": ["a", "ä", None, "b", "c", "d"],
+        "updated_date": pd.to_datetime(["2000-01-01", None] * 3),
+    }
+)
+
+
+@pytest.fixture
+def s3_connector():
+    with moto.mock_aws():
+        connector = S3Connector(aws_region="eu-central-1")
+        boto3.client("s3", region_name="eu-central-1").create_bucket(
+            Bucket=test_bucket,
+            CreateBucketConfiguration={"LocationConstraint": "eu-central-1"},
+        )
+        yield connector
+
+
+def get_object_contents(object_key: str) -> bytes:
+    return (
+        boto3.client("s3", region_name="eu-central-1")
+        .get_object(Bucket=test_bucket, Key=object_key)["Body"]
+        .read()
+    )
+
+
+def test_001_upload_dataframe_as_csv(s3_connector):
+    s3_connector.upload_dataframe_as_csv(
+        test_df, bucket=test_bucket, object_key="test.csv", chunk_size=4
+    )
+    csv_contents = get_object_contents("test.csv")
+    assert csv_contents.startswith(b"\xef\xbb\xbfid,name,updated_date\n")
+    assert csv_contents.count(b"\xef\xbb\xbf") == 1
+    assert csv_contents.count(b"\n") == 7
+    assert b"NaT" not in csv_contents
+    assert "2,#N/A,2000-01-01\n3,b,#N/A\n".encode("utf-8") in csv_contents
+
+
+def test_002_multipart_writer(s3_connector):
+    client = boto3.client("s3", region_name="eu-central-1")
+    contents = os.urandom(S3MultipartWriter._minimum_part_size * 2 + 1)
+    part_size = S3MultipartWriter._minimum_part_size
+    with S3MultipartWriter(
+        client, test_bucket, "test.bin", part_size=part_size, max_workers=2
+    ) as writer:
+        writer.write(contents[:100])
+        writer.write(contents[100:])
+    assert len(writer.get_parts()) == 3
+    assert get_object_contents("test.bin") == contents
+
+    with pytest.raises(RuntimeError):
+        with S3MultipartWriter(client, test_bucket, "aborted.bin") as writer:
+            writer.write(contents)
+            raise RuntimeError()
+    response = client.list_objects_v2(Bucket=test_bucket, Prefix="aborted")
+    assert "Contents" not in response
+    assert "Uploads" not in client.list_multipart_uploads(Bucket=test_bucket)
+
+
+def test_003_upload_dataframe_as_compressed_csv(s3_connector):
+    s3_connector.upload_dataframe_as_csv(
+        test_df, bucket=test_bucket, object_key="test.csv", encoding="utf-8"
+    )
+    s3_connector.upload_dataframe_as_csv(
+        test_df,
+        bucket=test_bucket,
+        object_key="test.csv.gz",
+        encoding="utf-8",
+        compression="gzip",
+    )
+    assert gzip.decompress(get_object_contents("test.csv.gz")) == get_object_contents(
+        "test.csv"
+    )
+    response = boto3.client("s3", region_name="eu-central-1").head_object(
+        Bucket=test_bucket, Key="test.csv.gz"
+    )
+    assert response["ContentEncoding"] == "gzip"
+    assert response["ContentType"] == "text/csv"
+
+
+def test_004_upload_dataframe_as_parquet(s3_connector):
+    pq = pytest.importorskip("pyarrow.parquet")
+    s3_connector.upload_dataframe_as_parquet(
+        test_df,
+        bucket=test_bucket,
+        object_key="test.parquet",
+        row_group_size=4,
+        column_encoding={"id": "DELTA_BINARY_PACKED"},
+        use_dictionary=["name"],
+    )
+    parquet_file = pq.ParquetFile(io.BytesIO(get_object_contents("test.parquet")))
+    assert parquet_file.metadata.num_row_groups == 2
+    pd.testing.assert_frame_equal(parquet_file.read().to_pandas(), test_df)
+
+
+def test_005_get_dataframe_from_s3(s3_connector):
+    s3_connector.upload_dataframe_as_csv(
+        test_df, bucket=test_bucket, object_key="test.csv.gz", compression="gzip"
+    )
+    df = s3_connector.get_dataframe_from_s3(
+        test_bucket, "test.csv.gz", parse_dates=["updated_date"]
+    )
+    pd.testing.assert_frame_equal(df, test_df)
+
+    df_chunk_list = list(
+        s3_connector.iter_dataframe_from_s3(
+            test_bucket, "test.csv.gz", chunk_size=4, column_list=["id"]
+        )
+    )
+    assert [len(df_chunk.index) for df_chunk in df_chunk_list] == [4, 2]
+    assert df_chunk_list[1]["id"].tolist() == [4, 5]
+
+
+def test_006_get_dataframe_from_s3_as_parquet(s3_connector):
+    pytest.importorskip("pyarrow.parquet")
+    s3_connector.upload_dataframe_as_parquet(
+        test_df, bucket=test_bucket, object_key="test.parquet", row_group_size=4
+    )
+    pd.testing.assert_frame_equal(
+        s3_connector.get_dataframe_from_s3(test_bucket, "test.parquet"), test_df
+    )
+    df = s3_connector.get_dataframe_from_s3(
+        test_bucket, "test.parquet", column_list=["name"]
+    )
+    assert df.columns.tolist() == ["name"]
+
+
+def test_007_range_reader(s3_connector):
+    client = boto3.client("s3", region_name="eu-central-1")
+    contents = os.urandom(1000)
+    client.put_object(Bucket=test_bucket, Key="test.bin", Body=contents)
+    reader = S3RangeReader(client, test_bucket, "test.bin", read_ahead=10)
+    reader.seek(-10, io.SEEK_END)
+    assert reader.read() == contents[-10:]
+    reader.seek(5)
+    assert reader.read(3) == contents[5:8]
+    assert b"".join(reader.iter_chunks(part_size=300, max_workers=2)) == contents
+
+
+def test_008_upload_dataframes(s3_connector):
+    item_list = [
+        (test_df.iloc[: index + 1], test_bucket, f"part_{index}.csv")
+        for index in range(5)
+    ]
+    item_list.append((test_df, "missing-bucket", "test.csv"))
+    result_list = s3_connector.upload_dataframes(iter(item_list), max_workers=2)
+    assert [result["object_key"] for result in result_list[:5]] == [
+        f"part_{index}.csv" for index in range(5)
+    ]
+    assert result_list[4]["bytes"] == len(get_object_contents("part_4.csv"))
+    assert all(result["etag"] is not None for result in result_list[:5])
+    assert isinstance(result_list[5], Exception)